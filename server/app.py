@@ -1,14 +1,19 @@
-from flask import Flask, render_template, request, redirect, url_for, jsonify
+from flask import Flask, render_template, request, redirect, url_for, jsonify, Response, stream_with_context
 import logging
 import socket
 import os
 from werkzeug.utils import secure_filename
-from trans import process_files
+import trans
+from jobs import JobManager
+from transcript_index import segments_path
+import lessons
+import stt
 import question_gen
 import utils
 import json
 import slm_analyse
 import subprocess
+import shutil
 import signal
 import sys
 import threading
@@ -58,11 +63,82 @@ if os.environ.get('SNAPCLASS_LAUNCHED_BY_DESKTOP') != '1':
 
 def handle_sigterm(*args):
     print("[SnapClass] Server is shutting down.", flush=True)
+    # The desktop app waits 5 s before killing us; give running stages most of it
+    job_manager.shutdown(wait=False)
+    still_running = trans.shutdown_service(timeout=3.0)
+    if still_running:
+        print(f"[SnapClass] {still_running} processing stage(s) did not stop in time.", flush=True)
+    # Mark lessons cut short; POST /lessons/<id>/resume picks them up again.
+    # Only this server's lessons: ingest.py may be processing others
+    with submitted_lock:
+        lesson_ids = list(submitted_lessons)
+    for lesson_id in lesson_ids:
+        try:
+            if lessons.load_manifest(lesson_id).get("state") in ("created", "processing"):
+                lessons.update_manifest(lesson_id, state="interrupted")
+        except (OSError, ValueError):
+            continue  # cleared while the server was running
     print("Received SIGTERM, exiting Flask server.", flush=True)
     os._exit(0)
 
+# Lesson processing runs here so requests return immediately. Lessons have
+# separate workspaces, so several can be processed at once
+job_manager = JobManager(max_workers=int(os.environ.get("SNAPCLASS_LESSON_WORKERS", 2)))
+
+# Ids of the lessons this server queued, so shutdown marks only those
+submitted_lessons = set()
+submitted_lock = threading.Lock()
+
 signal.signal(signal.SIGTERM, handle_sigterm)
 
+
+def process_lesson(lesson_id, audio_path, pdf_path, status_callback=None, language="auto"):
+    """Job body for an uploaded lesson: transcribe and extract into its workspace"""
+    lessons.update_manifest(lesson_id, state="processing")
+    run = trans.get_service().submit(
+        audio_path,
+        pdf_path,
+        status_callback=status_callback,
+        language=language,
+        output_dir=lessons.output_dir(lesson_id)
+    )
+    try:
+        audio_output, pdf_output = run.result()
+    except Exception as e:
+        lessons.update_manifest(lesson_id, state="failed", error=str(e))
+        raise
+    lessons.update_manifest(
+        lesson_id,
+        state="processed",
+        durations=run.durations,
+        outputs={
+            'transcript': lessons.relative_path(lesson_id, audio_output),
+            'segments': lessons.relative_path(lesson_id, segments_path(audio_output)),
+            'content': lessons.relative_path(lesson_id, pdf_output)
+        }
+    )
+    return {
+        'lesson_id': lesson_id,
+        'audio_output': audio_output,
+        'pdf_output': pdf_output,
+        'durations': run.durations
+    }
+
+
+def submit_lesson(lesson_id, audio_path, pdf_path, language="auto"):
+    """Queue process_lesson for a lesson and return its Job"""
+    with submitted_lock:
+        submitted_lessons.add(lesson_id)
+    return job_manager.submit("lesson", process_lesson, lesson_id, audio_path, pdf_path, language=language)
+
+
+def read_output(path, fallback):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except Exception:
+        return fallback
+
 # Combined Admin Dashboard
 @app.route("/admin", methods=["GET", "POST"])
 def admin():
@@ -73,65 +149,31 @@ def admin():
             audio = request.files['audio']  
             
             if pdf.filename != '' and audio.filename != '':
-                # Save files with fixed names
-                pdf_path = os.path.join(app.config['UPLOAD_FOLDER'], 'sample_content.md')
-                audio_path = os.path.join(app.config['UPLOAD_FOLDER'], 'class_audio_transcription.md')
-                
+                # Each upload gets its own workspace, so lessons never overwrite each other
+                lesson_id = lessons.create_lesson()
+                pdf_path = lessons.upload_path(lesson_id, pdf.filename)
+                audio_path = lessons.upload_path(lesson_id, audio.filename)
                 pdf.save(pdf_path)
                 audio.save(audio_path)
-                
-                # Before processing files in the /admin route
-                output_dir = os.path.join(BASE_DIR, "output")
-                transcript_files = [
-                    os.path.join(output_dir, "sample_content.md"),
-                    os.path.join(output_dir, "class_audio_transcription.md"),
-                ]
-
-                for file_path in transcript_files:
-                    if os.path.exists(file_path):
-                        os.remove(file_path)
-
-                try:
-                    # Process files in parallel
-                    updates = []
-                    def status_callback(update):
-                        updates.append(update)
-                    
-                    audio_output, pdf_output = process_files(
-                        audio_path,
-                        pdf_path,
-                        status_callback=status_callback
-                    )
-
-                    # Read the output files' content
-                    audio_text = ""
-                    pdf_text = ""
-                    try:
-                        with open(audio_output, "r", encoding="utf-8") as f:
-                            audio_text = f.read()
-                    except Exception:
-                        audio_text = "Could not read audio transcription output."
-
-                    try:
-                        with open(pdf_output, "r", encoding="utf-8") as f:
-                            pdf_text = f.read()
-                    except Exception:
-                        pdf_text = "Could not read PDF extraction output."
-
-                    return jsonify({
-                        'success': True,
-                        'message': 'Files processed successfully',
-                        'updates': updates,
-                        'audio_output': audio_output,
-                        'pdf_output': pdf_output,
-                        'audio_text': audio_text,
-                        'pdf_text': pdf_text
-                    })
-                except Exception as e:
-                    return jsonify({
-                        'success': False,
-                        'message': f'Error processing files: {str(e)}'
-                    })
+
+                # Process in the background; the page follows /jobs/<id>
+                language = request.form.get("language") or "auto"
+                lessons.update_manifest(
+                    lesson_id,
+                    language=language,
+                    inputs={
+                        'audio': lessons.relative_path(lesson_id, audio_path),
+                        'pdf': lessons.relative_path(lesson_id, pdf_path)
+                    }
+                )
+                job = submit_lesson(lesson_id, audio_path, pdf_path, language=language)
+                return jsonify({
+                    'success': True,
+                    'message': 'Files uploaded, processing started',
+                    'job_id': job.id,
+                    'lesson_id': lesson_id,
+                    'status_url': url_for('job_status', job_id=job.id)
+                }), 202
         
         # Handle question submission
         question = request.form.get("question")
@@ -213,7 +255,10 @@ def submit():
 def generate_ques():
     try:
         print("Generating questions...",flush=True)
-        para1, para2 = question_gen.read_paragraphs()
+        # Lesson to ask about; the most recently processed one by default
+        payload = request.get_json(silent=True) or {}
+        lesson_id = payload.get("lesson_id") or request.form.get("lesson_id")
+        para1, para2 = question_gen.read_paragraphs(lesson_id)
         questions = question_gen.generate_questions(para1, para2)
         questions = questions.split("\n")
         q = []
@@ -227,6 +272,7 @@ def generate_ques():
         generated_data = {
             "questions": questions,
             "generated_date": datetime.now().isoformat(),
+            "lesson_id": lesson_id or lessons.latest_lesson_id(),
             "status": "generated"  # not yet published
         }
         
@@ -292,6 +338,94 @@ def get_generated_questions_status():
         return jsonify({"success": False, "message": str(e)})
 
 
+@app.route("/whisper_status", methods=["GET"])
+def whisper_status():
+    """Report whether the Whisper model is unloaded, loading or warm"""
+    return jsonify({"success": True, **stt.whisper_manager.status()})
+
+
+@app.route("/lessons/<lesson_id>/resume", methods=["POST"])
+def resume_lesson(lesson_id):
+    """Process an interrupted or failed lesson again in its own workspace
+
+    The transcription continues from its checkpoint and unchanged PDF pages
+    come from the page cache, so only the unfinished work is redone.
+    """
+    try:
+        manifest = lessons.load_manifest(lesson_id)
+    except (OSError, ValueError):
+        return jsonify({"success": False, "message": "Unknown lesson"}), 404
+    if manifest.get("state") not in ("interrupted", "failed"):
+        return jsonify({"success": False, "message": f"Lesson is {manifest.get('state')}"}), 409
+    base = lessons.lesson_dir(lesson_id)
+    lessons.update_manifest(lesson_id, state="created", error=None)
+    job = submit_lesson(
+        lesson_id,
+        os.path.join(base, manifest["inputs"]["audio"]),
+        os.path.join(base, manifest["inputs"]["pdf"]),
+        language=manifest.get("language", "auto")
+    )
+    return jsonify({
+        'success': True,
+        'message': 'Processing resumed',
+        'job_id': job.id,
+        'lesson_id': lesson_id,
+        'status_url': url_for('job_status', job_id=job.id)
+    }), 202
+
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    """State, stage progress, timings and result paths of a processing job
+
+    ?since=<seq> also returns the status updates numbered after seq.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"success": False, "message": "Unknown job"}), 404
+    info = job.to_dict(since=request.args.get("since", type=int))
+    if job.state == "succeeded":
+        info["audio_text"] = read_output(job.result["audio_output"], "Could not read audio transcription output.")
+        info["pdf_text"] = read_output(job.result["pdf_output"], "Could not read PDF extraction output.")
+    return jsonify({"success": True, **info})
+
+
+@app.route("/jobs/<job_id>/events", methods=["GET"])
+def job_events(job_id):
+    """Server-Sent Events stream of a job's status and content updates
+
+    Each update is sent as it is produced, with its sequence number as the
+    event id so a reconnecting browser resumes via Last-Event-ID. A final
+    'done' event carries the job state; the stream then ends.
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"success": False, "message": "Unknown job"}), 404
+    since = request.headers.get("Last-Event-ID", type=int) or request.args.get("since", 0, type=int)
+    subscription = job.subscribe(since=since)
+
+    def events():
+        try:
+            while True:
+                updates = subscription.get(timeout=15)
+                for update in updates:
+                    yield f"id: {update['seq']}\ndata: {json.dumps(update)}\n\n"
+                if not updates:
+                    if subscription.closed:
+                        break
+                    yield ": keep-alive\n\n"
+            done = {"state": job.state, "error": job.error, "dropped": subscription.dropped}
+            yield f"event: done\ndata: {json.dumps(done)}\n\n"
+        finally:
+            job.unsubscribe(subscription)
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.route("/clear_all_data", methods=["POST"])
 def clear_all_data():
     """Clear all previous data: test questions, output files, analysis, and submissions"""
@@ -330,6 +464,15 @@ def clear_all_data():
                 file_path = os.path.join(uploads_dir, filename)
                 if os.path.isfile(file_path):
                     files_to_delete.append(file_path)
+
+        # Clear lesson workspaces, except the ones still being processed
+        lesson_dirs = []
+        for manifest in lessons.list_lessons():
+            if manifest.get("state") in ("created", "processing"):
+                continue
+            lesson_dirs.append(lessons.lesson_dir(manifest["id"]))
+            for root, _, filenames in os.walk(lesson_dirs[-1]):
+                files_to_delete.extend(os.path.join(root, filename) for filename in filenames)
         
         # Delete all files
         deleted_count = 0
@@ -339,6 +482,8 @@ def clear_all_data():
                 deleted_count += 1
             except Exception as e:
                 print(f"Error deleting {file_path}: {e}")
+        for directory in lesson_dirs:
+            shutil.rmtree(directory, ignore_errors=True)
         
         print("[SnapClass] Previous records cleared successfully!",flush=True)
         
@@ -359,7 +504,12 @@ def clear_all_data():
 def analyse():
     try:
         print("[SnapClass] Analysing result...")
-        analysis_result = slm_analyse.get_analysis()
+        # Grade against the lesson the published test was generated from
+        lesson_id = request.args.get("lesson_id")
+        if not lesson_id and os.path.exists(GENERATED_QUESTIONS_FILE):
+            with open(GENERATED_QUESTIONS_FILE, "r", encoding="utf-8") as f:
+                lesson_id = json.load(f).get("lesson_id")
+        analysis_result = slm_analyse.get_analysis(lesson_id)
         
         if not analysis_result["success"]:
             return render_template("analysis.html", error=analysis_result["error"], data=analysis_result)
@@ -0,0 +1,83 @@
+"""
+Compare Whisper inference modes (speed and accuracy) on a fixed audio fixture.
+
+Usage:
+    python bench_whisper.py lecture_sample.wav
+    python bench_whisper.py lecture_sample.wav --modes fp32 int8 --reference sample.txt
+
+Every mode transcribes the same fixed 30 s windows of the fixture. Accuracy
+is reported as word error rate against --reference, or against the first
+mode's output when no reference text is given.
+"""
+
+import argparse
+import time
+
+import stt
+
+
+def word_error_rate(reference, hypothesis):
+    """Word-level Levenshtein distance divided by the reference length."""
+    ref = reference.lower().split()
+    hyp = hypothesis.lower().split()
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, start=1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word),
+            )
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def run_mode(mode, chunks, batch_size):
+    manager = stt.WhisperModelManager(stt.model_dir, idle_timeout=None, mode=mode)
+    stt.whisper_manager = manager
+
+    start = time.perf_counter()
+    with manager.acquire():
+        load_time = time.perf_counter() - start
+        # Warm-up so one-time compilation is not counted as decoding time
+        stt.transcribe_batch(chunks[:1])
+        start = time.perf_counter()
+        texts = []
+        for i in range(0, len(chunks), batch_size):
+            texts.extend(stt.transcribe_batch(chunks[i:i + batch_size]))
+        decode_time = time.perf_counter() - start
+    manager.unload()
+    return " ".join(text for text in texts if text), load_time, decode_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Whisper inference modes")
+    parser.add_argument("audio", help="Audio fixture to transcribe")
+    parser.add_argument("--modes", nargs="+", default=list(stt.WHISPER_MODES), choices=stt.WHISPER_MODES)
+    parser.add_argument("--reference", help="Text file with the expected transcript")
+    parser.add_argument("--batch-size", type=int, default=4)
+    args = parser.parse_args()
+
+    chunks = [samples for _, samples in stt.iter_audio_windows(args.audio, use_vad=False)]
+    audio_sec = sum(len(chunk) for chunk in chunks) / 16000
+    reference = None
+    if args.reference:
+        with open(args.reference, "r", encoding="utf-8") as f:
+            reference = f.read()
+
+    print(f"Fixture: {args.audio} ({audio_sec:.0f}s, {len(chunks)} chunks)")
+    print(f"{'mode':<15}{'load s':>9}{'decode s':>10}{'x realtime':>12}{'WER':>8}")
+    for mode in args.modes:
+        text, load_time, decode_time = run_mode(mode, chunks, args.batch_size)
+        if reference is None:
+            reference = text
+        wer = word_error_rate(reference, text)
+        speed = audio_sec / decode_time if decode_time else float("inf")
+        print(f"{mode:<15}{load_time:>9.1f}{decode_time:>10.1f}{speed:>12.1f}{wer:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
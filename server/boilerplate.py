@@ -0,0 +1,132 @@
+import os
+import re
+from collections import Counter
+
+PAGE_HEADING = re.compile(r"^## Page \d+\s*$", re.MULTILINE)
+PAGE_NUMBER = re.compile(r"^(page\s*)?(\d{1,4}|[ivx]{1,5})(\s*(of|/)\s*\d+)?$|^[-–—]\s*\d+\s*[-–—]$", re.IGNORECASE)
+
+
+# Page numbers inside a running header/footer: "page 3 of 10"
+PAGE_TOKEN = re.compile(r"\bpage\s+\d+(\s*(of|/)\s*\d+)?\b")
+
+# A number set off from the header text ("14 | Motion", "Physics - 14"). It
+# is only a page number if it tracks the page, see normalise_line
+LEADING_NUMBER = re.compile(r"^(\d{1,4})(?=\s*[|·•–—-])")
+TRAILING_NUMBER = re.compile(r"(?<=[|·•–—-])(\s*)(\d{1,4})$")
+
+
+def page_number(heading):
+    """Page number of a "## Page N" heading."""
+    return int(heading.split()[-1])
+
+
+def normalise_line(line, page=None):
+    """Lower-case, collapse whitespace and mask page numbers ("Page 3 of 10" == "Page 4 of 10").
+
+    With the page's number, a number at the start or end of the line that
+    is set off by a separator is replaced by its offset from the page, so
+    "Physics - 14" on page 14 and "Physics - 15" on page 15 match, while
+    "Question 1" and "Question 2" or "Exercise 3.1" and "Exercise 3.2" stay
+    different.
+    """
+    line = PAGE_TOKEN.sub("#", " ".join(line.lower().split()))
+    if page is None:
+        return line
+    line = LEADING_NUMBER.sub(lambda m: f"#{int(m.group(1)) - page:+d}", line)
+    return TRAILING_NUMBER.sub(lambda m: f"{m.group(1)}#{int(m.group(2)) - page:+d}", line)
+
+
+def split_pages(markdown):
+    """Split extractor markdown into the part before the first page and (heading, body) pairs."""
+    headings = list(PAGE_HEADING.finditer(markdown))
+    if not headings:
+        return markdown, []
+    pages = []
+    for i, match in enumerate(headings):
+        end = headings[i + 1].start() if i + 1 < len(headings) else len(markdown)
+        pages.append((match.group(0), markdown[match.end():end]))
+    return markdown[:headings[0].start()], pages
+
+
+def _edge_lines(lines, edge_lines):
+    """Indices of the first and last non-empty lines of a page.
+
+    At most edge_lines from each end, and never more than a third of the
+    page, so short pages keep their body text.
+    """
+    filled = [i for i, line in enumerate(lines) if line.strip()]
+    count = min(edge_lines, len(filled) // 3)
+    if count == 0:
+        return set()
+    return set(filled[:count] + filled[-count:])
+
+
+def find_boilerplate(page_bodies, page_numbers=None, min_fraction=0.5, min_pages=3, edge_lines=2):
+    """Return the normalised lines that repeat at the top or bottom of many pages.
+
+    A line counts as a running header/footer when it is among the first or
+    last edge_lines lines of at least min_pages pages and of min_fraction of
+    all pages. Only page edges are considered so that repeated phrases in the
+    body text are kept. page_numbers (one per body) let bare page numbers in
+    headers match across pages.
+    """
+    if page_numbers is None:
+        page_numbers = [None] * len(page_bodies)
+    counts = Counter()
+    for body, page in zip(page_bodies, page_numbers):
+        lines = body.splitlines()
+        counts.update({normalise_line(lines[i], page) for i in _edge_lines(lines, edge_lines)})
+    needed = max(min_pages, min_fraction * len(page_bodies))
+    return {line for line, count in counts.items() if line and count >= needed}
+
+
+def strip_boilerplate(markdown, **kwargs):
+    """Remove running headers, footers and page numbers from extractor markdown.
+
+    Returns (cleaned_markdown, stats) where stats has the characters and
+    (approximate, 4 chars per token) prompt tokens saved.
+    """
+    edge_lines = kwargs.get("edge_lines", 2)
+    prefix, pages = split_pages(markdown)
+    repeated = find_boilerplate(
+        [body for _, body in pages], [page_number(heading) for heading, _ in pages], **kwargs
+    )
+
+    lines_removed = 0
+    out = [prefix]
+    for heading, body in pages:
+        page = page_number(heading)
+        lines = body.splitlines(keepends=True)
+        edges = _edge_lines(lines, edge_lines)
+        kept = []
+        for i, line in enumerate(lines):
+            stripped = line.strip()
+            if i in edges and (normalise_line(stripped, page) in repeated or PAGE_NUMBER.match(stripped)):
+                lines_removed += 1
+                continue
+            kept.append(line)
+        out.append(heading)
+        out.append("".join(kept))
+
+    cleaned = "".join(out)
+    chars_saved = len(markdown) - len(cleaned)
+    return cleaned, {
+        "lines_removed": lines_removed,
+        "chars_before": len(markdown),
+        "chars_after": len(cleaned),
+        "chars_saved": chars_saved,
+        "tokens_saved": chars_saved // 4,
+    }
+
+
+def clean_content_file(path, **kwargs):
+    """Strip boilerplate from a *_content.md file in place and return the stats."""
+    with open(path, "r", encoding="utf-8") as f:
+        markdown = f.read()
+    cleaned, stats = strip_boilerplate(markdown, **kwargs)
+    if stats["lines_removed"]:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(cleaned)
+        os.replace(tmp_path, path)
+    return stats
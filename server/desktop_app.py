@@ -8,6 +8,7 @@ import webbrowser
 import customtkinter as ctk
 from tkinter import messagebox
 import queue
+import multiprocessing
 
 # --- CONFIG ---
 FLASK_PORT = 5000
@@ -35,8 +36,9 @@ class FlaskServerManager:
                 cmd = [sys.executable, "--run-server"]
                 cwd = os.path.dirname(sys.executable)
             else:
-                app_path = os.path.join(base_dir, "app.py")
-                cmd = [sys.executable, app_path]
+                # Not app.py itself: spawned workers re-run the main module
+                server_path = os.path.join(base_dir, "run_server.py")
+                cmd = [sys.executable, server_path]
                 cwd = base_dir
             self.process = subprocess.Popen(
                 cmd,
@@ -546,6 +548,8 @@ class SnapClassDesktopApp(ctk.CTk):
         self.destroy()
 
 if __name__ == "__main__":
+    # Needed for the frozen exe to start transcription worker processes
+    multiprocessing.freeze_support()
     # If launched with --run-server, start Flask server inline (frozen mode helper)
     if len(sys.argv) > 1 and sys.argv[1] == "--run-server":
         try:
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def file_sha256(path, block_size=1 << 20):
+    """Hash a file's bytes without reading it into memory at once."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def make_key(*parts):
+    """Build a cache key from strings and JSON-serialisable parameters."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, (str, bytes)):
+            part = json.dumps(part, sort_keys=True)
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """Content-addressed JSON cache on disk with size-based LRU eviction.
+
+    Every entry is one <key>.json file. Reads refresh the file's mtime, so
+    when the directory grows past max_bytes the least recently used entries
+    are deleted first, down to evict_to of the budget so that the next puts
+    do not immediately trigger another scan. Hits and misses are counted
+    and, with log_each, logged per lookup (caches with many small entries
+    log a summary instead).
+    """
+
+    def __init__(self, directory, max_bytes, name="cache", log_each=True, evict_to=0.8):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.evict_to = evict_to
+        self.name = name
+        self.log_each = log_each
+        self.hits = 0
+        self.misses = 0
+        self._total_bytes = None  # directory size, scanned on first put
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def contains(self, key):
+        return os.path.exists(self._path(key))
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            if self.log_each:
+                logger.info("%s cache miss %s (hits=%d misses=%d)", self.name, key[:12], self.hits, self.misses)
+            return None
+        with self._lock:
+            self.hits += 1
+        if self.log_each:
+            logger.info("%s cache hit %s (hits=%d misses=%d)", self.name, key[:12], self.hits, self.misses)
+        return value
+
+    def put(self, key, value):
+        """Store value under key, then evict old entries if over budget."""
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(value, f)
+        size = os.path.getsize(tmp_path)
+        with self._lock:
+            try:
+                old_size = os.path.getsize(path)  # replacing an entry frees its old bytes
+            except OSError:
+                old_size = 0
+            os.replace(tmp_path, path)
+            if self._total_bytes is None:
+                self._scan()
+            else:
+                self._total_bytes += size - old_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _scan(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(".json"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        self._total_bytes = sum(size for _, size, _ in entries)
+        return entries
+
+    def _evict(self):
+        # Rescan rather than trust the running total: entries may have been
+        # overwritten or removed by another process
+        entries = self._scan()
+        target = self.max_bytes * self.evict_to
+        for _, size, path in sorted(entries):
+            if self._total_bytes <= target:
+                break
+            try:
+                os.remove(path)
+                self._total_bytes -= size
+                logger.info("%s cache evicted %s", self.name, os.path.basename(path))
+            except OSError:
+                pass
+
+    def stats(self):
+        return {"name": self.name, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,214 @@
+"""
+Process many lessons (audio recording + PDF) ahead of time.
+
+Usage:
+    python ingest.py semester/
+    python ingest.py lessons.json --whisper-jobs 1 --pdf-jobs 3
+
+A directory is searched for pairs: an audio file and a PDF with the same
+name (week01.mp3 + week01.pdf), or a sub-folder holding exactly one of each.
+A manifest is a JSON list of {"audio": ..., "pdf": ..., "language": ...}
+entries with paths relative to the manifest.
+
+Every pair becomes a lesson workspace (see lessons.py). Transcription and
+PDF extraction are scheduled on separate pools, so a slow recording never
+holds up the PDFs queued behind it. Pairs whose exact inputs were already
+processed are skipped; unfinished ones continue in their existing workspace.
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+if __name__ != "__mp_main__":
+    # PDF and transcription workers are spawned and re-run this file as
+    # __mp_main__; they import what their own task needs, not Whisper et al.
+    from pypdf import PdfReader
+
+    import lessons
+    from disk_cache import file_sha256, make_key
+    from pdf_reader2 import PDFTextImageExtractorPypdf as PDFTextImageExtractor
+    from stt import audio_duration
+    from transcript_index import segments_path
+    from trans import ContentProcessor
+
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".m4a", ".flac", ".ogg", ".aac", ".wma"}
+
+
+def _files_by_kind(paths):
+    audio = [path for path in paths if os.path.splitext(path)[1].lower() in AUDIO_EXTENSIONS]
+    pdfs = [path for path in paths if os.path.splitext(path)[1].lower() == ".pdf"]
+    return audio, pdfs
+
+
+def find_pairs(directory):
+    """Match audio files with PDFs of the same name, then one-pair sub-folders."""
+    pairs = []
+    entries = sorted(os.path.join(directory, name) for name in os.listdir(directory))
+    audio, pdfs = _files_by_kind([path for path in entries if os.path.isfile(path)])
+    pdf_by_stem = {os.path.splitext(os.path.basename(path))[0].lower(): path for path in pdfs}
+    for audio_path in audio:
+        pdf_path = pdf_by_stem.get(os.path.splitext(os.path.basename(audio_path))[0].lower())
+        if pdf_path:
+            pairs.append({"audio": audio_path, "pdf": pdf_path})
+        else:
+            print(f"[SnapClass] No PDF found for {audio_path}, skipping", flush=True)
+
+    for folder in (path for path in entries if os.path.isdir(path)):
+        files = [os.path.join(folder, name) for name in sorted(os.listdir(folder))]
+        audio, pdfs = _files_by_kind(files)
+        if len(audio) == 1 and len(pdfs) == 1:
+            pairs.append({"audio": audio[0], "pdf": pdfs[0]})
+    return pairs
+
+
+def read_manifest(path):
+    with open(path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    return [
+        dict(entry, audio=os.path.join(base, entry["audio"]), pdf=os.path.join(base, entry["pdf"]))
+        for entry in entries
+    ]
+
+
+def lessons_by_input():
+    """input_key -> manifest of the newest lesson made from those inputs."""
+    return {
+        manifest["input_key"]: manifest
+        for manifest in lessons.list_lessons()
+        if manifest.get("input_key")
+    }
+
+
+def ingest(pairs, whisper_jobs=1, pdf_jobs=2, language="auto", force=False):
+    """Process every pair and return a summary dict with throughput figures."""
+    start = time.perf_counter()
+    known = lessons_by_input()
+    seen = set()
+    summary = {"processed": 0, "skipped": 0, "failed": 0, "audio_sec": 0.0, "pages": 0}
+    lock = threading.Lock()
+    stage_time = {"audio": 0.0, "pdf": 0.0}
+
+    def timed(stage, fn, *args):
+        stage_start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            with lock:
+                stage_time[stage] += time.perf_counter() - stage_start
+
+    # One extractor for every PDF, so its worker processes start only once
+    pdf_extractor = PDFTextImageExtractor(
+        workers=int(os.environ.get("SNAPCLASS_PDF_WORKERS", min(4, os.cpu_count() or 1)))
+    )
+    scheduled = []
+    with ThreadPoolExecutor(whisper_jobs, thread_name_prefix="ingest-audio") as audio_pool, \
+            ThreadPoolExecutor(pdf_jobs, thread_name_prefix="ingest-pdf") as pdf_pool:
+        for pair in pairs:
+            try:
+                input_key = make_key("lesson", file_sha256(pair["audio"]), file_sha256(pair["pdf"]))
+            except OSError as e:
+                # One bad path must not stop the rest of the run
+                print(f"[SnapClass] Cannot read {pair['audio']} / {pair['pdf']}: {e}", flush=True)
+                summary["failed"] += 1
+                continue
+            previous = known.get(input_key)
+            if input_key in seen or (previous and previous.get("state") == "processed" and not force):
+                where = f"as lesson {previous['id']}" if previous else "earlier in this run"
+                print(f"[SnapClass] Already processed {where}: {pair['audio']}", flush=True)
+                summary["skipped"] += 1
+                continue
+            # Identical pairs listed twice are processed once
+            seen.add(input_key)
+
+            if previous and previous.get("state") != "processed":
+                # Finish an interrupted or failed run in its own workspace
+                lesson_id = previous["id"]
+                print(f"[SnapClass] Resuming lesson {lesson_id}: {pair['audio']}", flush=True)
+            else:
+                lesson_id = lessons.create_lesson()
+            lessons.update_manifest(
+                lesson_id,
+                state="processing",
+                error=None,
+                source="ingest",
+                input_key=input_key,
+                language=pair.get("language", language),
+                inputs={"audio": os.path.abspath(pair["audio"]), "pdf": os.path.abspath(pair["pdf"])}
+            )
+            processor = ContentProcessor(
+                output_dir=lessons.output_dir(lesson_id),
+                language=pair.get("language", language),
+                pdf_extractor=pdf_extractor
+            )
+            scheduled.append((
+                lesson_id,
+                pair,
+                audio_pool.submit(timed, "audio", processor.process_audio, pair["audio"]),
+                pdf_pool.submit(timed, "pdf", processor.process_pdf, pair["pdf"]),
+            ))
+
+        for lesson_id, pair, audio_future, pdf_future in scheduled:
+            # Wait for both stages, so a failed lesson has nothing still writing
+            wait([audio_future, pdf_future])
+            try:
+                audio_output, pdf_output = audio_future.result(), pdf_future.result()
+            except Exception as e:
+                lessons.update_manifest(lesson_id, state="failed", error=str(e))
+                print(f"[SnapClass] Lesson {lesson_id} failed: {e}", flush=True)
+                summary["failed"] += 1
+                continue
+            lessons.update_manifest(
+                lesson_id,
+                state="processed",
+                outputs={
+                    "transcript": lessons.relative_path(lesson_id, audio_output),
+                    "segments": lessons.relative_path(lesson_id, segments_path(audio_output)),
+                    "content": lessons.relative_path(lesson_id, pdf_output),
+                }
+            )
+            summary["processed"] += 1
+            summary["audio_sec"] += audio_duration(pair["audio"])
+            summary["pages"] += len(PdfReader(pair["pdf"]).pages)
+            print(f"[SnapClass] Lesson {lesson_id} ready ({os.path.basename(pair['audio'])})", flush=True)
+    pdf_extractor.close()
+
+    summary["wall_sec"] = time.perf_counter() - start
+    summary["audio_stage_sec"] = stage_time["audio"]
+    summary["pdf_stage_sec"] = stage_time["pdf"]
+    return summary
+
+
+def print_summary(summary):
+    wall = summary["wall_sec"] or 1e-9
+    print(f"\nLessons: {summary['processed']} processed, {summary['skipped']} skipped, {summary['failed']} failed")
+    print(f"Wall time: {summary['wall_sec']:.0f}s")
+    print(f"Audio: {summary['audio_sec'] / 60:.1f} min transcribed, "
+          f"{summary['audio_sec'] / wall:.1f}x realtime overall "
+          f"({summary['audio_stage_sec']:.0f}s busy in the Whisper stage)")
+    print(f"PDF: {summary['pages']} pages, {summary['pages'] / wall:.1f} pages/s overall "
+          f"({summary['pdf_stage_sec']:.0f}s busy in the PDF stage)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-process lesson recordings and PDFs")
+    parser.add_argument("source", help="Directory of lesson pairs or a JSON manifest")
+    parser.add_argument("--whisper-jobs", type=int, default=1,
+                        help="Recordings transcribed at the same time (they share one Whisper model)")
+    parser.add_argument("--pdf-jobs", type=int, default=2, help="PDFs extracted at the same time")
+    parser.add_argument("--language", default="auto", help="Lecture language code, or auto")
+    parser.add_argument("--force", action="store_true", help="Process pairs that were already processed")
+    args = parser.parse_args()
+
+    pairs = find_pairs(args.source) if os.path.isdir(args.source) else read_manifest(args.source)
+    print(f"[SnapClass] Found {len(pairs)} lesson(s) in {args.source}", flush=True)
+    summary = ingest(pairs, args.whisper_jobs, args.pdf_jobs, args.language, args.force)
+    print_summary(summary)
+
+
+if __name__ == "__main__":
+    main()
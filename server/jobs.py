@@ -0,0 +1,217 @@
+import itertools
+import logging
+import threading
+import time
+import traceback
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Status updates kept per job for clients that poll with ?since=
+MAX_JOB_UPDATES = 500
+
+# Updates buffered per live subscriber before the oldest are dropped
+SUBSCRIBER_BUFFER = 200
+
+
+class Subscription:
+    """Live feed of one job's updates for a single client.
+
+    The buffer is bounded: when the client reads slower than the pipeline
+    produces, the oldest updates are dropped and counted in `dropped`, so a
+    stalled browser never holds back processing or grows memory.
+    """
+
+    def __init__(self, maxlen=SUBSCRIBER_BUFFER):
+        self.dropped = 0
+        self.closed = False
+        self._buffer = deque(maxlen=maxlen)
+        self._cond = threading.Condition()
+
+    def push(self, update):
+        with self._cond:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append(update)
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Return the buffered updates, waiting up to timeout for the first one.
+
+        An empty list means the wait timed out or the feed is closed.
+        """
+        with self._cond:
+            if not self._buffer and not self.closed:
+                self._cond.wait(timeout)
+            updates = list(self._buffer)
+            self._buffer.clear()
+            return updates
+
+
+class Job:
+    """One background processing run and everything a client may ask about it.
+
+    State goes queued -> running -> succeeded | failed. Status updates from
+    the pipeline are numbered, kept (the last MAX_JOB_UPDATES of them) and
+    pushed to live subscribers; updates that carry a 'stage' also update that
+    stage's progress.
+    """
+
+    def __init__(self, kind):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.state = "queued"
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.stages = {}
+        self.result = None
+        self.error = None
+        self.future = None
+        self._updates = deque(maxlen=MAX_JOB_UPDATES)
+        self._subscribers = []
+        self._seq = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def record(self, update):
+        """status_callback for the pipeline: store the update and track stage progress."""
+        now = time.time()
+        with self._lock:
+            update = dict(update, seq=next(self._seq), time=now)
+            self._updates.append(update)
+            for subscriber in self._subscribers:
+                subscriber.push(update)
+            name = update.get("stage")
+            if name is None or update.get("type") == "content":
+                return
+            stage = self.stages.setdefault(name, {"started_at": now})
+            stage["updated_at"] = now
+            stage["message"] = update.get("message")
+            for key in ("current", "total"):
+                if key in update:
+                    stage[key] = update[key]
+
+    def updates_since(self, seq=0):
+        with self._lock:
+            return [update for update in self._updates if update["seq"] > seq]
+
+    def subscribe(self, since=0, maxlen=SUBSCRIBER_BUFFER):
+        """Return a Subscription that starts with the stored updates after since.
+
+        The subscription is already closed when the job has finished, so the
+        reader drains the backlog and stops.
+        """
+        subscription = Subscription(maxlen)
+        with self._lock:
+            for update in self._updates:
+                if update["seq"] > since:
+                    subscription.push(update)
+            if self.done:
+                subscription.close()
+            else:
+                self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    def _finish(self, state, result=None, error=None):
+        with self._lock:
+            self.state = state
+            self.result = result
+            self.error = error
+            self.finished_at = time.time()
+            subscribers, self._subscribers = self._subscribers, []
+        for subscriber in subscribers:
+            subscriber.close()
+
+    @property
+    def done(self):
+        return self.state in ("succeeded", "failed")
+
+    def to_dict(self, since=None):
+        with self._lock:
+            end = self.finished_at or time.time()
+            info = {
+                "id": self.id,
+                "kind": self.kind,
+                "state": self.state,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "queued_sec": round((self.started_at or end) - self.created_at, 3),
+                "running_sec": round(end - self.started_at, 3) if self.started_at else None,
+                "stages": {name: dict(stage) for name, stage in self.stages.items()},
+                "result": self.result,
+                "error": self.error,
+            }
+        if since is not None:
+            info["updates"] = self.updates_since(since)
+        return info
+
+
+class JobManager:
+    """Run jobs on a small background thread pool and keep them addressable by id.
+
+    max_workers jobs run at once (app.py uses SNAPCLASS_LESSON_WORKERS,
+    default 2; lessons have separate workspaces and share one Whisper model).
+    Further submissions wait in the queue while the web server stays
+    responsive.
+    """
+
+    def __init__(self, max_workers=1, keep_finished=50):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="snapclass-job")
+        self.keep_finished = keep_finished
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind, fn, *args, **kwargs):
+        """Queue fn(*args, status_callback=job.record, **kwargs) and return its Job.
+
+        fn's return value becomes job.result; an exception marks the job failed.
+        """
+        job = Job(kind)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        job.future = self.executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job, fn, args, kwargs):
+        job.started_at = time.time()
+        job.state = "running"
+        print(f"[SnapClass] Job {job.id} ({job.kind}) started", flush=True)
+        try:
+            result = fn(*args, status_callback=job.record, **kwargs)
+        except Exception as e:
+            logger.error("Job %s failed:\n%s", job.id, traceback.format_exc())
+            job._finish("failed", error=str(e))
+            print(f"[SnapClass] Job {job.id} failed: {e}", flush=True)
+            return
+        job._finish("succeeded", result=result)
+        print(f"[SnapClass] Job {job.id} finished in {job.finished_at - job.started_at:.1f}s", flush=True)
+
+    def _prune(self):
+        finished = sorted((job for job in self._jobs.values() if job.done), key=lambda job: job.finished_at)
+        for job in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job.id]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self):
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.created_at)
+
+    def shutdown(self, wait=False):
+        self.executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,127 @@
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+
+from werkzeug.utils import secure_filename
+
+
+def get_base_dir():
+    """Get the correct base directory for MSIX or dev environment."""
+    if getattr(sys, 'frozen', False):  # Running as MSIX/compiled
+        return os.path.dirname(sys.executable)
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+LESSONS_DIR = os.path.join(get_base_dir(), "lessons")
+
+# Outputs written by the single-workspace layout used before lessons existed
+LEGACY_TRANSCRIPT = os.path.join(get_base_dir(), "output", "class_audio_transcription_transcription.md")
+LEGACY_CONTENT = os.path.join(get_base_dir(), "output", "sample_content_content.md")
+
+_manifest_lock = threading.Lock()
+
+
+def lesson_dir(lesson_id):
+    # Ids come from URLs and form fields, so never let them leave LESSONS_DIR
+    if not lesson_id or secure_filename(lesson_id) != lesson_id:
+        raise ValueError(f"Invalid lesson id: {lesson_id!r}")
+    return os.path.join(LESSONS_DIR, lesson_id)
+
+
+def manifest_path(lesson_id):
+    return os.path.join(lesson_dir(lesson_id), "manifest.json")
+
+
+def create_lesson():
+    """Create an empty workspace lessons/<id>/{uploads,output} and its manifest."""
+    lesson_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    base = lesson_dir(lesson_id)
+    os.makedirs(os.path.join(base, "uploads"))
+    os.makedirs(os.path.join(base, "output"))
+    write_manifest(lesson_id, {
+        "id": lesson_id,
+        "created_at": time.time(),
+        "state": "created",
+        "inputs": {},
+        "outputs": {},
+    })
+    return lesson_id
+
+
+def upload_path(lesson_id, filename):
+    """Where to save an uploaded file inside the lesson workspace."""
+    return os.path.join(lesson_dir(lesson_id), "uploads", secure_filename(filename) or "upload")
+
+
+def output_dir(lesson_id):
+    return os.path.join(lesson_dir(lesson_id), "output")
+
+
+def relative_path(lesson_id, path):
+    """Manifest paths are relative to the workspace so lessons can be moved."""
+    return os.path.relpath(path, lesson_dir(lesson_id)).replace(os.sep, "/")
+
+
+def write_manifest(lesson_id, manifest):
+    path = manifest_path(lesson_id)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_manifest(lesson_id):
+    with open(manifest_path(lesson_id), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def update_manifest(lesson_id, **fields):
+    """Merge fields into the manifest; dict values (inputs, outputs) are merged key by key."""
+    with _manifest_lock:
+        manifest = load_manifest(lesson_id)
+        for key, value in fields.items():
+            if isinstance(value, dict) and isinstance(manifest.get(key), dict):
+                manifest[key].update(value)
+            else:
+                manifest[key] = value
+        manifest["updated_at"] = time.time()
+        write_manifest(lesson_id, manifest)
+        return manifest
+
+
+def list_lessons():
+    """Manifests of all lessons, oldest first."""
+    manifests = []
+    if os.path.isdir(LESSONS_DIR):
+        for name in os.listdir(LESSONS_DIR):
+            try:
+                manifests.append(load_manifest(name))
+            except (OSError, ValueError):
+                continue
+    return sorted(manifests, key=lambda manifest: manifest.get("created_at", 0))
+
+
+def latest_lesson_id():
+    """Id of the most recently created lesson that finished processing, or None."""
+    done = [manifest for manifest in list_lessons() if manifest.get("state") == "processed"]
+    return done[-1]["id"] if done else None
+
+
+def lesson_outputs(lesson_id=None):
+    """(transcript path, PDF content path) of a lesson, by default the latest one.
+
+    Falls back to the fixed files in output/ when no lesson has been processed
+    yet, so content prepared before workspaces existed keeps working.
+    """
+    if lesson_id is None:
+        lesson_id = latest_lesson_id()
+        if lesson_id is None:
+            return LEGACY_TRANSCRIPT, LEGACY_CONTENT
+    outputs = load_manifest(lesson_id).get("outputs", {})
+    if "transcript" not in outputs or "content" not in outputs:
+        raise FileNotFoundError(f"Lesson {lesson_id} has not been processed")
+    base = lesson_dir(lesson_id)
+    return os.path.join(base, outputs["transcript"]), os.path.join(base, outputs["content"])
@@ -0,0 +1,68 @@
+import threading
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class BatchLogMel:
+    """Whisper log-mel spectrograms for a batch of audio windows, in NumPy.
+
+    Produces the same features as WhisperFeatureExtractor (periodic Hann
+    window, centred STFT with reflect padding, power spectrum, log10 mel,
+    8 dB dynamic range clamp per window, (x + 4) / 4 scaling) but computes
+    the whole batch with one rfft and one matmul. The window, mel filterbank
+    and scratch buffers are created once and reused between calls.
+    """
+
+    def __init__(self, mel_filters, n_fft=400, hop_length=160, n_samples=480000):
+        self.mel_filters = np.asarray(mel_filters, dtype=np.float32)  # (n_freqs, n_mels)
+        self.n_mels = self.mel_filters.shape[1]
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.n_samples = n_samples
+        self.n_frames = n_samples // hop_length
+        n = np.arange(n_fft, dtype=np.float64)
+        self.window = (0.5 - 0.5 * np.cos(2.0 * np.pi * n / n_fft)).astype(np.float32)
+        self._padded = None
+        self._lock = threading.Lock()
+
+    def _scratch(self, batch_size):
+        if self._padded is None or self._padded.shape[0] != batch_size:
+            self._padded = np.zeros((batch_size, self.n_samples + self.n_fft), dtype=np.float32)
+        return self._padded
+
+    def __call__(self, chunk_arrays, out=None):
+        """Return (or write into out) features of shape (batch, n_mels, n_frames).
+
+        Chunks shorter than n_samples are zero-padded and longer ones trimmed,
+        like the 30 s windows Whisper expects.
+        """
+        batch_size = len(chunk_arrays)
+        if out is None:
+            out = np.empty((batch_size, self.n_mels, self.n_frames), dtype=np.float32)
+        half = self.n_fft // 2
+
+        with self._lock:
+            padded = self._scratch(batch_size)
+            padded.fill(0.0)
+            for i, chunk in enumerate(chunk_arrays):
+                chunk = chunk[:self.n_samples]
+                padded[i, half:half + len(chunk)] = chunk
+            # Reflect padding of the (zero-padded) 30 s signal, as in a centred STFT
+            padded[:, :half] = padded[:, half + 1:2 * half + 1][:, ::-1]
+            padded[:, half + self.n_samples:] = padded[:, self.n_samples - 1:half + self.n_samples - 1][:, ::-1]
+
+            frames = sliding_window_view(padded, self.n_fft, axis=1)[:, ::self.hop_length][:, :self.n_frames]
+            spectrum = np.fft.rfft(frames * self.window, axis=-1)
+            power = np.square(spectrum.real, dtype=np.float32)
+            power += np.square(spectrum.imag, dtype=np.float32)
+            mel = np.matmul(power, self.mel_filters)  # (batch, n_frames, n_mels)
+
+        np.maximum(mel, 1e-10, out=mel)
+        np.log10(mel, out=mel)
+        floor = mel.max(axis=(1, 2), keepdims=True) - 8.0
+        np.maximum(mel, floor, out=mel)
+        mel += 4.0
+        mel /= 4.0
+        out[...] = mel.transpose(0, 2, 1)
+        return out
@@ -1,7 +1,38 @@
 import os
 import sys
-from typing import Callable, Dict, List, Any
+import hashlib
+import itertools
+import logging
+import multiprocessing
+import shutil
+import threading
+from collections import deque
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Deque, Dict, Iterator, List, Any, TextIO, Tuple
+import pypdf
 from pypdf import PdfReader
+from disk_cache import DiskCache, make_key
+
+try:
+	import pytesseract
+	from pdf2image import convert_from_path
+except ImportError:  # OCR fallback is optional
+	pytesseract = None
+	convert_from_path = None
+
+logger = logging.getLogger(__name__)
+
+# Below this many pages per worker, process start-up costs more than it saves
+MIN_PAGES_PER_WORKER = 8
+
+# Extracted page texts keyed by page content hash (see page_fingerprint)
+PDF_PAGE_CACHE_MB = float(os.environ.get("SNAPCLASS_PDF_CACHE_MB", 128))
+
+# Pages with fewer non-whitespace characters than this are treated as scans
+OCR_MIN_CHARS = 20
+OCR_DPI = 300
+OCR_LANG = os.environ.get("SNAPCLASS_OCR_LANG", "eng")
 
 
 def get_base_dir() -> str:
@@ -11,103 +42,521 @@ def get_base_dir() -> str:
 	return os.path.dirname(os.path.abspath(__file__))
 
 
+def _extract_page_text(page) -> str:
+	try:
+		return page.extract_text() or ""
+	except Exception:
+		return ""
+
+
+def _extract_pages(pdf_path: str, page_nums: List[int]) -> List[Tuple[int, str]]:
+	"""Process-pool worker: open the PDF independently and extract the given pages."""
+	reader = PdfReader(pdf_path)
+	return [(page_num, _extract_page_text(reader.pages[page_num])) for page_num in page_nums]
+
+
+def poppler_path() -> str | None:
+	"""Bundled poppler binaries next to the app, or None to use the system PATH."""
+	base_dir = get_base_dir()
+	for candidate in ("poppler/Library/bin", "poppler/bin", "poppler"):
+		path = os.path.join(base_dir, candidate)
+		if os.path.isfile(os.path.join(path, "pdftoppm.exe")) or os.path.isfile(os.path.join(path, "pdftoppm")):
+			return path
+	return None
+
+
+def tesseract_cmd() -> str | None:
+	"""Bundled tesseract executable next to the app, or None to use the system PATH."""
+	for name in ("tesseract.exe", "tesseract"):
+		path = os.path.join(get_base_dir(), "tesseract", name)
+		if os.path.isfile(path):
+			return path
+	return None
+
+
+_ocr_checked: bool | None = None
+_ocr_check_lock = threading.Lock()
+
+
+def ocr_available() -> bool:
+	"""Whether pytesseract, tesseract and poppler are all usable.
+
+	Checked once per process; when something is missing OCR is turned off
+	with a single warning instead of failing on every scanned page.
+	"""
+	global _ocr_checked
+	with _ocr_check_lock:
+		if _ocr_checked is None:
+			_ocr_checked = _check_ocr()
+		return _ocr_checked
+
+
+def _check_ocr() -> bool:
+	if pytesseract is None:
+		return False
+	tesseract = tesseract_cmd()
+	if tesseract:
+		pytesseract.pytesseract.tesseract_cmd = tesseract
+	try:
+		pytesseract.get_tesseract_version()
+	except Exception as e:
+		logger.warning("OCR disabled, tesseract is not usable: %s", e)
+		return False
+	if poppler_path() is None and shutil.which("pdftoppm") is None:
+		logger.warning("OCR disabled, poppler (pdftoppm) was not found")
+		return False
+	return True
+
+
+def _ocr_page(pdf_path: str, page_num: int, dpi: int, lang: str,
+			  poppler: str | None, tesseract: str | None) -> str:
+	"""Process-pool worker: rasterise one page and OCR it."""
+	if tesseract:
+		pytesseract.pytesseract.tesseract_cmd = tesseract
+	images = convert_from_path(
+		pdf_path, dpi=dpi, first_page=page_num + 1, last_page=page_num + 1, poppler_path=poppler
+	)
+	return "\n".join(pytesseract.image_to_string(image, lang=lang) for image in images).strip()
+
+
+def _hash_resources(digest: Any, resources: Any, include_images: bool, seen: set) -> None:
+	"""Hash the fonts and XObjects of a resource dictionary into digest.
+
+	Form XObjects are followed recursively (text drawn through "/Fm0 Do"
+	lives in the form, not the page's content stream), with their own
+	/Resources when they have them. Image XObjects only matter for OCR.
+	"""
+	if resources is None:
+		return
+	resources = resources.get_object()
+	fonts = resources.get("/Font")
+	if fonts is not None:
+		for name, ref in sorted(fonts.get_object().items()):
+			font = ref.get_object()
+			digest.update(f"{name}|{font.get('/BaseFont')}|{font.get('/Encoding')}".encode())
+			to_unicode = font.get("/ToUnicode")
+			if to_unicode is not None:
+				digest.update(to_unicode.get_object().get_data())
+	xobjects = resources.get("/XObject")
+	if xobjects is None:
+		return
+	for name, ref in sorted(xobjects.get_object().items()):
+		xobject = ref.get_object()
+		subtype = xobject.get("/Subtype")
+		if subtype == "/Image" and not include_images:
+			continue
+		ident = getattr(ref, "idnum", None)
+		if ident is not None:
+			if ident in seen:
+				digest.update(f"{name}|seen {ident}".encode())
+				continue
+			seen.add(ident)
+		digest.update(f"{name}|{subtype}|{xobject.get('/Matrix')}".encode())
+		digest.update(xobject.get_data())
+		if subtype == "/Form":
+			_hash_resources(digest, xobject.get("/Resources"), include_images, seen)
+
+
+def page_fingerprint(page, include_images: bool = False) -> str | None:
+	"""Hash everything extract_text() depends on: content streams, fonts and forms.
+
+	Form XObjects are always included, since their content is extracted as
+	page text. With include_images the page's image XObjects are hashed too,
+	which is what OCR output depends on (a scan's content stream is only
+	"draw /Im0"). Returns None when the page cannot be hashed; such pages
+	are never cached.
+	"""
+	try:
+		digest = hashlib.sha256()
+		contents = page.get_contents()
+		if contents is not None:
+			digest.update(contents.get_data())
+		digest.update(str(page.get("/Rotate", 0)).encode())
+		_hash_resources(digest, page.get("/Resources"), include_images, set())
+		return digest.hexdigest()
+	except Exception:
+		return None
+
+
+def default_page_cache(name: str = "pdf_pages") -> DiskCache:
+	return DiskCache(
+		os.path.join(get_base_dir(), "cache", name),
+		max_bytes=int(PDF_PAGE_CACHE_MB * 1024 * 1024),
+		name=name.replace("_", " "),
+		log_each=False
+	)
+
+
 class PDFTextImageExtractorPypdf:
 	"""Extract text content from PDF using pypdf and save in the same
 	markdown format produced by PDFTextImageExtractor in pdf_reader.py.
 	
 	- Matches the JSON structure returned by extract_full_content()
 	- Matches save_to_markdown() section layout
+	- iter_pages()/stream_to_markdown() write pages as they are extracted
 	- Images are not analyzed here; the 'images' list per page is left empty
+	- With workers > 1, page ranges of large PDFs are extracted in a process
+	  pool that is started on first use and kept until close()
+	- With use_cache, pages whose content is unchanged since an earlier run
+	  are read from the page cache instead of being extracted again
+	- With ocr, pages with (almost) no text layer are rasterised and run
+	  through tesseract in a pool of ocr_workers processes; results, also
+	  empty or failed ones, are cached per page hash. OCR is off when
+	  tesseract or poppler is missing (see ocr_available)
 	"""
 
-	def __init__(self) -> None:
+	def __init__(self, workers: int = 1, use_cache: bool = True, ocr: bool = True,
+				 ocr_workers: int = 2) -> None:
 		self.base_dir = get_base_dir()
+		self.workers = max(1, workers)
+		self.cache = default_page_cache() if use_cache else None
+		self.ocr = ocr and ocr_available()
+		self.ocr_workers = max(1, ocr_workers)
+		self.ocr_cache = default_page_cache("pdf_ocr") if use_cache and self.ocr else None
+		self._pools: Dict[str, ProcessPoolExecutor] = {}
+		self._pool_lock = threading.Lock()
 
-	def extract_full_content(
+	def _pool(self, name: str, workers: int) -> ProcessPoolExecutor:
+		# Spawned workers are slow to start, so one pool per kind serves every PDF
+		with self._pool_lock:
+			if name not in self._pools:
+				self._pools[name] = ProcessPoolExecutor(
+					max_workers=workers,
+					mp_context=multiprocessing.get_context("spawn"),
+				)
+			return self._pools[name]
+
+	def _discard_pool(self, name: str, pool: ProcessPoolExecutor) -> None:
+		# A worker died; the next PDF starts a fresh pool
+		with self._pool_lock:
+			if self._pools.get(name) is pool:
+				del self._pools[name]
+		pool.shutdown(wait=False, cancel_futures=True)
+
+	def close(self) -> None:
+		"""Stop the worker processes; they are started again if needed."""
+		with self._pool_lock:
+			pools, self._pools = list(self._pools.values()), {}
+		for pool in pools:
+			pool.shutdown(wait=False, cancel_futures=True)
+
+	def _page_groups(self, page_nums: List[int]) -> List[List[int]]:
+		# A few groups per worker so that slow (dense) pages even out
+		num_groups = min(self.workers * 4, max(1, len(page_nums) // MIN_PAGES_PER_WORKER))
+		size = -(-len(page_nums) // num_groups)
+		return [page_nums[i:i + size] for i in range(0, len(page_nums), size)]
+
+	def _page_key(self, page) -> str | None:
+		fingerprint = page_fingerprint(page)
+		if fingerprint is None:
+			return None
+		# Extraction output can change between pypdf releases
+		return make_key("pypdf", pypdf.__version__, fingerprint)
+
+	def _iter_texts_parallel(
 		self,
 		pdf_path: str,
-		output_dir: str = "output",
+		page_nums: List[int],
+		num_pages: int,
 		status_callback: Callable[[Dict[str, Any]], None] | None = None,
-	) -> Dict[str, Any]:
-		os.makedirs(output_dir, exist_ok=True)
+	) -> Iterator[Tuple[int, str]]:
+		"""Yield (page_index, text) for page_nums, in order, from the worker pool."""
+		groups = self._page_groups(page_nums)
+		workers = min(self.workers, len(groups))
+		pool = self._pool("pages", self.workers)
+		# Keep a couple of groups per worker in flight so finished pages
+		# do not pile up in memory ahead of the consumer
+		pending: Deque[Tuple[List[int], Any]] = deque()
+		queued = iter(groups)
+		try:
+			for group in itertools.islice(queued, 2 * workers):
+				pending.append((group, pool.submit(_extract_pages, pdf_path, group)))
+			while pending:
+				group, future = pending.popleft()
+				for next_group in itertools.islice(queued, 1):
+					pending.append((next_group, pool.submit(_extract_pages, pdf_path, next_group)))
+				results = future.result()
+				if status_callback:
+					status_callback({
+						'type': 'status',
+						'message': f"Pages {group[0] + 1}-{group[-1] + 1}/{num_pages} processed"
+					})
+				yield from results
+		except BrokenProcessPool:
+			self._discard_pool("pages", pool)
+			raise
+		finally:
+			# The pool outlives this PDF, so drop work nobody will read
+			for _, future in pending:
+				future.cancel()
 
-		reader = PdfReader(pdf_path)
+	def _iter_texts_sequential(
+		self,
+		reader: PdfReader,
+		page_nums: List[int],
+		num_pages: int,
+		status_callback: Callable[[Dict[str, Any]], None] | None = None,
+	) -> Iterator[Tuple[int, str]]:
+		for page_num in page_nums:
+			if status_callback:
+				status_callback({
+					'type': 'status',
+					'message': f"Processing page {page_num + 1}/{num_pages}..."
+				})
+
+			text = _extract_page_text(reader.pages[page_num])
+
+			if status_callback:
+				status_callback({
+					'type': 'status',
+					'message': f"Page {page_num + 1} processed - {len(text)} chars, 0 images"
+				})
+
+			yield page_num, text
+
+	def iter_pages(
+		self,
+		pdf_path: str,
+		reader: PdfReader | None = None,
+		status_callback: Callable[[Dict[str, Any]], None] | None = None,
+	) -> Iterator[Dict[str, Any]]:
+		"""Yield page dicts (same schema as extract_full_content) in page order.
+
+		Status updates carry current (pages finished, i.e. extracted and, if
+		needed, OCR'd) and total (pages in the document).
+		"""
+		if reader is None:
+			reader = PdfReader(pdf_path)
 		num_pages = len(reader.pages)
+		done = 0
 
-		if status_callback:
-			status_callback({
-				'type': 'status',
-				'message': f"PDF loaded successfully. Total pages: {num_pages}"
-			})
+		def report(update: Dict[str, Any]) -> None:
+			status_callback({**update, 'current': done, 'total': num_pages})
 
-		full_content: Dict[str, Any] = {
-			'metadata': {
-				'source': os.path.basename(pdf_path),
-				'total_pages': num_pages,
-			},
-			'pages': []
-		}
+		callback = report if status_callback else None
+		pages = self._iter_text_pages(pdf_path, reader, callback)
+		if self.ocr:
+			pages = self._with_ocr(pdf_path, reader, pages, callback)
+		for page in pages:
+			done += 1
+			yield page
+		if callback:
+			callback({'type': 'status', 'message': f"All {num_pages} pages extracted"})
 
-		for page_num in range(num_pages):
+	def _with_ocr(
+		self,
+		pdf_path: str,
+		reader: PdfReader,
+		pages: Iterator[Dict[str, Any]],
+		status_callback: Callable[[Dict[str, Any]], None] | None = None,
+	) -> Iterator[Dict[str, Any]]:
+		"""OCR pages without a usable text layer, keeping pages in order.
+
+		Pages are held back only while an earlier page is still being OCR'd,
+		and at most two OCR jobs per worker are queued at a time.
+		"""
+		# (page, OCR future or None, cache key, pool the future runs in)
+		pending: Deque[Tuple[Dict[str, Any], Any, str | None, Any]] = deque()
+		outstanding = 0
+
+		def finish(page: Dict[str, Any], future: Any, key: str | None, pool: Any) -> Dict[str, Any]:
+			try:
+				text = future.result()
+			except (BrokenProcessPool, CancelledError) as e:
+				# Not the page's fault: keep its text layer and try again next run
+				logger.warning("OCR of page %d was not run: %r", page['page_number'], e)
+				if isinstance(e, BrokenProcessPool):
+					self._discard_pool("ocr", pool)
+				return page
+			except Exception as e:
+				# Remembered like an empty result, so the page is not retried every run
+				logger.warning("OCR failed on page %d: %s", page['page_number'], e)
+				if key is not None and self.ocr_cache is not None:
+					self.ocr_cache.put(key, {'text': "", 'error': str(e)})
+				return page
+			if key is not None and self.ocr_cache is not None:
+				self.ocr_cache.put(key, {'text': text})
+			if text:
+				page['text'] = text
 			if status_callback:
 				status_callback({
 					'type': 'status',
-					'message': f"Processing page {page_num + 1}/{num_pages}..."
+					'message': f"Page {page['page_number']} OCR'd - {len(text)} chars"
 				})
+			return page
 
-			page = reader.pages[page_num]
-			try:
-				text = page.extract_text() or ""
-			except Exception:
-				text = ""
+		try:
+			for page in pages:
+				future, key, pool = None, None, None
+				if len(page['text'].strip()) < OCR_MIN_CHARS:
+					fingerprint = page_fingerprint(reader.pages[page['page_number'] - 1], include_images=True)
+					if fingerprint is not None:
+						key = make_key("ocr", OCR_DPI, OCR_LANG, fingerprint)
+					cached = self.ocr_cache.get(key) if key and self.ocr_cache is not None else None
+					if cached is not None:
+						page['text'] = cached['text'] or page['text']
+					else:
+						pool = self._pool("ocr", self.ocr_workers)
+						future = pool.submit(
+							_ocr_page, pdf_path, page['page_number'] - 1, OCR_DPI, OCR_LANG,
+							poppler_path(), tesseract_cmd()
+						)
+						outstanding += 1
+				pending.append((page, future, key, pool))
 
-			page_content = {
+				# Release pages that are ready; block only when too much OCR is queued
+				while pending:
+					head, head_future, head_key, head_pool = pending[0]
+					if head_future is not None:
+						if not head_future.done() and outstanding <= 2 * self.ocr_workers:
+							break
+						head = finish(head, head_future, head_key, head_pool)
+						outstanding -= 1
+					pending.popleft()
+					yield head
+
+			while pending:
+				head, head_future, head_key, head_pool = pending.popleft()
+				if head_future is not None:
+					head = finish(head, head_future, head_key, head_pool)
+				yield head
+		finally:
+			# The pool outlives this PDF, so drop OCR nobody will read
+			for _, future, _, _ in pending:
+				if future is not None:
+					future.cancel()
+
+	def _iter_text_pages(
+		self,
+		pdf_path: str,
+		reader: PdfReader,
+		status_callback: Callable[[Dict[str, Any]], None] | None = None,
+	) -> Iterator[Dict[str, Any]]:
+		num_pages = len(reader.pages)
+
+		keys: List[str | None] = [None] * num_pages
+		if self.cache is not None:
+			keys = [self._page_key(reader.pages[page_num]) for page_num in range(num_pages)]
+		todo = [page_num for page_num, key in enumerate(keys) if key is None or not self.cache.contains(key)]
+		if self.cache is not None:
+			reused = num_pages - len(todo)
+			logger.info("pdf page cache: %d/%d pages unchanged, %d to extract", reused, num_pages, len(todo))
+			if reused and status_callback:
+				status_callback({
+					'type': 'status',
+					'message': f"{reused}/{num_pages} pages unchanged since last run, loaded from cache"
+				})
+
+		if self.workers > 1 and len(todo) >= 2 * MIN_PAGES_PER_WORKER:
+			extracted = self._iter_texts_parallel(pdf_path, todo, num_pages, status_callback)
+		else:
+			extracted = self._iter_texts_sequential(reader, todo, num_pages, status_callback)
+
+		todo_set = set(todo)
+		for page_num in range(num_pages):
+			key = keys[page_num]
+			if page_num in todo_set:
+				_, text = next(extracted)
+				if key is not None:
+					self.cache.put(key, {'text': text})
+			else:
+				cached = self.cache.get(key)
+				if cached is not None:
+					text = cached['text']
+				else:
+					# Evicted since the lookup above
+					text = _extract_page_text(reader.pages[page_num])
+
+			yield {
 				'page_number': page_num + 1,
 				'text': text,
 				'images': [],          # Keep schema compatibility
 				'tables': [],          # Placeholder for schema compatibility
 			}
 
-			full_content['pages'].append(page_content)
+	def _open(
+		self,
+		pdf_path: str,
+		status_callback: Callable[[Dict[str, Any]], None] | None = None,
+	) -> PdfReader:
+		reader = PdfReader(pdf_path)
+		if status_callback:
+			status_callback({
+				'type': 'status',
+				'message': f"PDF loaded successfully. Total pages: {len(reader.pages)}",
+				'current': 0,
+				'total': len(reader.pages)
+			})
+		return reader
 
-			if status_callback:
-				status_callback({
-					'type': 'status',
-					'message': f"Page {page_num + 1} processed - {len(text)} chars, 0 images"
-				})
+	def extract_full_content(
+		self,
+		pdf_path: str,
+		output_dir: str = "output",
+		status_callback: Callable[[Dict[str, Any]], None] | None = None,
+	) -> Dict[str, Any]:
+		os.makedirs(output_dir, exist_ok=True)
+
+		reader = self._open(pdf_path, status_callback)
+		return {
+			'metadata': {
+				'source': os.path.basename(pdf_path),
+				'total_pages': len(reader.pages),
+			},
+			'pages': list(self.iter_pages(pdf_path, reader, status_callback))
+		}
+
+	@staticmethod
+	def _write_header(f: TextIO, source: str, total_pages: int) -> None:
+		f.write(f"# Complete Extraction from: {source}\n\n")
+		f.write(f"**Total Pages:** {total_pages}\n\n")
 
-		return full_content
+	@staticmethod
+	def _write_page(f: TextIO, page: Dict[str, Any]) -> None:
+		f.write(f"\n\n## Page {page['page_number']}\n\n")
+		f.write((page.get('text') or "") + "\n\n")
+
+		# Keep the image section parity even if empty
+		for img in page.get('images', []) or []:
+			f.write(f"\n### Image (Page {img.get('page', page['page_number'])})\n")
+			f.write(f"**Type:** {(img.get('type') or 'unknown').title()}\n\n")
+			# Minimal placeholders; this extractor does not caption images
+			f.write(f"**Description:** (not available in pypdf extractor)\n\n")
+			f.write(f"**Educational Analysis:** (not available in pypdf extractor)\n\n")
+			f.write("**Key Concepts:** \n")
 
 	def save_to_markdown(self, content: Dict[str, Any], output_path: str) -> None:
 		"""Save results to markdown file (same formatting as pdf_reader.py)."""
 		with open(output_path, "w", encoding="utf-8") as f:
-			f.write(f"# Complete Extraction from: {content['metadata']['source']}\n\n")
-			f.write(f"**Total Pages:** {content['metadata']['total_pages']}\n\n")
-
+			self._write_header(f, content['metadata']['source'], content['metadata']['total_pages'])
 			for page in content['pages']:
-				f.write(f"\n\n## Page {page['page_number']}\n\n")
-				f.write((page.get('text') or "") + "\n\n")
-
-				# Keep the image section parity even if empty
-				for img in page.get('images', []) or []:
-					f.write(f"\n### Image (Page {img.get('page', page['page_number'])})\n")
-					f.write(f"**Type:** {(img.get('type') or 'unknown').title()}\n\n")
-					# Minimal placeholders; this extractor does not caption images
-					f.write(f"**Description:** (not available in pypdf extractor)\n\n")
-					f.write(f"**Educational Analysis:** (not available in pypdf extractor)\n\n")
-					f.write("**Key Concepts:** \n")
+				self._write_page(f, page)
+
+	def stream_to_markdown(self, pdf_path: str, output_path: str,
+						   status_callback: Callable[[Dict[str, Any]], None] | None = None) -> int:
+		"""Extract pages and write each one to output_path as soon as it is ready.
+
+		Only one page is held in memory at a time and the markdown file is
+		readable while extraction continues. Returns the number of pages.
+		"""
+		reader = self._open(pdf_path, status_callback)
+		num_pages = len(reader.pages)
+		with open(output_path, "w", encoding="utf-8") as f:
+			self._write_header(f, os.path.basename(pdf_path), num_pages)
+			for page in self.iter_pages(pdf_path, reader, status_callback):
+				self._write_page(f, page)
+				f.flush()
+		return num_pages
 
 	def extract_and_save(self, pdf_path: str, output_dir: str = "output",
 						  status_callback: Callable[[Dict[str, Any]], None] | None = None) -> str:
 		"""End-to-end helper that writes to output/<base_name>_content.md (matches app.py/trans.py)."""
 		os.makedirs(output_dir, exist_ok=True)
-		content = self.extract_full_content(pdf_path, output_dir=output_dir, status_callback=status_callback)
 		base_name = os.path.splitext(os.path.basename(pdf_path))[0]
 		out_path = os.path.join(output_dir, f"{base_name}_content.md")
-		self.save_to_markdown(content, out_path)
+		self.stream_to_markdown(pdf_path, out_path, status_callback=status_callback)
 		return out_path
 
-
 if __name__ == "__main__":
 	import argparse
 
@@ -115,13 +564,14 @@ if __name__ == "__main__":
 	parser.add_argument("pdf", help="Path to input PDF")
 	parser.add_argument("--out", help="Output markdown file path (overrides default)")
 	parser.add_argument("--outdir", help="Output directory (default: output)", default="output")
+	parser.add_argument("--workers", type=int, default=1, help="Worker processes for large PDFs (default: 1)")
 	args = parser.parse_args()
 
-	extractor = PDFTextImageExtractorPypdf()
+	extractor = PDFTextImageExtractorPypdf(workers=args.workers)
 	if args.out:
 		# honor explicit override
-		content = extractor.extract_full_content(args.pdf, output_dir=os.path.dirname(args.out) or args.outdir)
-		extractor.save_to_markdown(content, args.out)
+		os.makedirs(os.path.dirname(args.out) or args.outdir, exist_ok=True)
+		extractor.stream_to_markdown(args.pdf, args.out)
 		print(f"Extraction complete. Saved to: {args.out}")
 	else:
 		# default naming: output/<base_name>_content.md
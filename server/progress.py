@@ -0,0 +1,75 @@
+import threading
+import time
+
+
+class ProgressReporter:
+    """Rate-limit status updates per stage before they reach a callback.
+
+    Use an instance as a status_callback. Status updates are coalesced to at
+    most max_per_sec per stage: the first update of a stage is always sent,
+    later ones inside the interval replace each other and only the newest is
+    sent once the interval has passed. flush(stage) sends the update still
+    held back, so the last state of a stage is never lost. Content updates
+    (transcript text) and updates without a 'stage' (start and completion
+    messages) are never dropped.
+
+    Every update that goes out carries cumulative counters: 'events' (status
+    updates seen so far for its stage) and 'coalesced' (how many were folded
+    into this one).
+    """
+
+    def __init__(self, callback, max_per_sec=2.0, clock=time.monotonic):
+        self.callback = callback
+        self.interval = 1.0 / max_per_sec if max_per_sec else 0.0
+        self.clock = clock
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def _stage(self, name):
+        if name not in self._stages:
+            self._stages[name] = {"events": 0, "sent": 0, "coalesced": 0, "last_sent": None, "pending": None}
+        return self._stages[name]
+
+    def __call__(self, update):
+        if update.get("type") == "content" or update.get("stage") is None:
+            self.callback(update)
+            return
+        with self._lock:
+            stage = self._stage(update.get("stage"))
+            stage["events"] += 1
+            now = self.clock()
+            due = stage["last_sent"] is None or now - stage["last_sent"] >= self.interval
+            if not due:
+                if stage["pending"] is not None:
+                    stage["coalesced"] += 1
+                stage["pending"] = update
+                return
+            if stage["pending"] is not None:
+                stage["coalesced"] += 1
+            update = self._mark_sent(stage, update, now)
+        self.callback(update)
+
+    def _mark_sent(self, stage, update, now):
+        update = dict(update, events=stage["events"], coalesced=stage["coalesced"])
+        stage["pending"] = None
+        stage["coalesced"] = 0
+        stage["last_sent"] = now
+        stage["sent"] += 1
+        return update
+
+    def flush(self, stage=None):
+        """Send the held-back update of a stage, if any."""
+        with self._lock:
+            state = self._stages.get(stage)
+            if state is None or state["pending"] is None:
+                return
+            update = self._mark_sent(state, state["pending"], self.clock())
+        self.callback(update)
+
+    def stats(self):
+        """Per-stage counts of status updates seen and sent."""
+        with self._lock:
+            return {
+                name: {"events": state["events"], "sent": state["sent"]}
+                for name, state in self._stages.items()
+            }
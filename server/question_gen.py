@@ -5,6 +5,7 @@ import json
 import subprocess
 import re
 import chat
+import lessons
 import sys
 
 
@@ -14,11 +15,10 @@ def get_base_dir():
         return os.path.dirname(sys.executable)
     return os.path.dirname(os.path.abspath(__file__))
 
-def read_paragraphs():
-    base_dir = os.path.join(get_base_dir(), 'output')
-    para1_path = os.path.join(base_dir, "class_audio_transcription_transcription.md")
-    para2_path = os.path.join(base_dir, "sample_content_content.md")
-    print(f"Looking for files in: {base_dir}", flush=True)
+def read_paragraphs(lesson_id=None):
+    """Transcript and PDF content of a lesson (the latest processed one by default)"""
+    para1_path, para2_path = lessons.lesson_outputs(lesson_id)
+    print(f"Looking for files in: {os.path.dirname(para1_path)}", flush=True)
     
     # Check if files exist
     if not os.path.exists(para1_path):
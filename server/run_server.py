@@ -0,0 +1,13 @@
+"""
+Start the SnapClass web server (desktop_app.py runs this in dev mode).
+
+PDF extraction, OCR and multi-process transcription use spawned worker
+processes, and spawn re-runs the main module in every worker. Keeping the
+main module this small means workers only import the module their task
+lives in, instead of app.py with Flask, Whisper, the job manager and the
+SIGTERM handler.
+"""
+
+if __name__ == "__main__":
+    from app import run_server
+    run_server()
@@ -11,6 +11,10 @@ def get_base_dir():
 WHISPER_MODEL_NAME = "openai/whisper-small"
 WHISPER_FOLDER_NAME = "whisper"
 
+# Draft model for assisted decoding; must share Whisper's tokenizer
+WHISPER_ASSISTANT_MODEL_NAME = "openai/whisper-tiny"
+WHISPER_ASSISTANT_FOLDER_NAME = "whisper-assistant"
+
 NOUGAT_MODEL_NAME = "facebook/nougat-small"
 NOUGAT_FOLDER_NAME = "nougat"
 
@@ -32,6 +36,19 @@ def whisper_setup_model():
     model.save_pretrained(model_dir)
     print(f"[SNAPCLASS SETUP] Whisper model downloaded and saved to: {model_dir}")
 
+def whisper_assistant_setup_model():
+    base_dir = get_base_dir()
+    model_dir = os.path.join(base_dir, WHISPER_ASSISTANT_FOLDER_NAME)
+    if os.path.exists(model_dir) and os.path.isdir(model_dir):
+        print(f"[SNAPCLASS SETUP] Model already exists in: {model_dir}")
+        return
+    print(f"[SNAPCLASS SETUP] Downloading whisper assistant model '{WHISPER_ASSISTANT_MODEL_NAME}' to '{model_dir}' ...")
+    os.makedirs(model_dir, exist_ok=True)
+    # Only the model is needed; decoding uses the main Whisper processor
+    model = AutoModelForSpeechSeq2Seq.from_pretrained(WHISPER_ASSISTANT_MODEL_NAME)
+    model.save_pretrained(model_dir)
+    print(f"[SNAPCLASS SETUP] Whisper assistant model downloaded and saved to: {model_dir}")
+
 def setup_nougat_model():
     base_dir = get_base_dir()
     model_dir = os.path.join(base_dir, NOUGAT_FOLDER_NAME)
@@ -65,5 +82,6 @@ def setup_blip_model():
 
 if __name__ == "__main__":
     whisper_setup_model()
+    whisper_assistant_setup_model()
     setup_nougat_model()
     setup_blip_model()
@@ -6,6 +6,7 @@ import json
 import subprocess
 from argparse import Namespace
 import chat
+import lessons
 import re
 import sys
 sys.stdout.reconfigure(encoding='utf-8')
@@ -16,10 +17,9 @@ def get_base_dir():
         return os.path.dirname(sys.executable)
     return os.path.dirname(os.path.abspath(__file__))
 
-def read_paragraphs():
-    base_dir = os.path.join(get_base_dir(), "output")
-    para1_path = os.path.join(base_dir, "class_audio_transcription_transcription.md")
-    para2_path = os.path.join(base_dir, "sample_content_content.md")
+def read_paragraphs(lesson_id=None):
+    """Transcript and PDF content of a lesson (the latest processed one by default)"""
+    para1_path, para2_path = lessons.lesson_outputs(lesson_id)
     with open(para1_path, "r", encoding="utf-8") as f:
         para1 = f.read()
     with open(para2_path, "r", encoding="utf-8") as f:
@@ -110,11 +110,11 @@ def sanitize_text_for_llm(text: str) -> str:
     return cleaned
 
 
-def get_analysis():
+def get_analysis(lesson_id=None):
     try:
         # Build non-JSON representations of student answers
         student_to_pairs = build_student_qa_pairs()
-        para1, para2 = read_paragraphs()
+        para1, para2 = read_paragraphs(lesson_id)
 
         if not student_to_pairs:
             print("[SnapClass] No submissions found!")
@@ -1,8 +1,25 @@
 import torch
 import librosa
 import numpy as np
+import soundfile as sf
+import soxr
 import sys, os
-from transformers import AutoProcessor, AutoModelForSpeechSeq2Seq
+import gc
+import json
+import time
+import uuid
+import threading
+import itertools
+import queue
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from transformers import AutoProcessor, AutoModelForSpeechSeq2Seq, BatchFeature
+from vad import stream_segment_windows
+from disk_cache import DiskCache, file_sha256, make_key
+from log_mel import BatchLogMel
+from transcript_index import save_segments, segments_path
 
 # Load model and processor (match sizes!)
 '''processor = AutoProcessor.from_pretrained("openai/whisper-small")
@@ -14,10 +31,209 @@ def get_base_dir():
     return os.path.dirname(os.path.abspath(__file__))
 
 model_dir = os.path.join(get_base_dir(), "whisper")
+# Optional small Whisper that drafts tokens for the main model (see setup.py)
+assistant_model_dir = os.path.join(get_base_dir(), "whisper-assistant")
 
-# Load from local directory
-processor = AutoProcessor.from_pretrained(model_dir, local_files_only=True)
-model = AutoModelForSpeechSeq2Seq.from_pretrained(model_dir, local_files_only=True)
+# Seconds the model stays loaded after the last transcription
+WHISPER_IDLE_TIMEOUT = float(os.environ.get("SNAPCLASS_WHISPER_IDLE_SEC", 300))
+
+# CPU inference mode: "fp32" (eager, full precision), "int8" (dynamic int8
+# quantization of the Linear layers) and "-compiled" variants of both, which
+# additionally run the encoder through torch.compile
+WHISPER_MODES = ("fp32", "int8", "fp32-compiled", "int8-compiled")
+WHISPER_MODE = os.environ.get("SNAPCLASS_WHISPER_MODE", "fp32")
+
+# Speculative (assisted) decoding with the whisper-assistant model
+WHISPER_USE_ASSISTANT = os.environ.get("SNAPCLASS_WHISPER_ASSISTANT", "0") == "1"
+
+
+def model_id(directory=model_dir):
+    """Identify a local Whisper checkpoint by its folder name and config.json."""
+    config_path = os.path.join(directory, "config.json")
+    try:
+        config_hash = file_sha256(config_path)[:16]
+    except OSError:
+        config_hash = "unknown"
+    return f"{os.path.basename(directory)}:{config_hash}"
+
+def _quantized_model_path(model_dir):
+    name = model_id(model_dir).replace(":", "-") + "-int8.pt"
+    return os.path.join(get_base_dir(), "cache", "models", name)
+
+def _load_quantized_model(model_dir):
+    """Load the int8 model, converting and caching it on disk on first use."""
+    cache_path = _quantized_model_path(model_dir)
+    if os.path.exists(cache_path):
+        try:
+            return torch.load(cache_path, weights_only=False)
+        except Exception as e:
+            print(f"[SnapClass] Ignoring unreadable quantized model cache: {e}", flush=True)
+
+    print("[SnapClass] Quantizing Whisper to int8 (one-time conversion)...", flush=True)
+    model = AutoModelForSpeechSeq2Seq.from_pretrained(model_dir, local_files_only=True)
+    model.eval()
+    model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = cache_path + ".tmp"
+    torch.save(model, tmp_path)
+    os.replace(tmp_path, cache_path)
+    return model
+
+def load_whisper_model(model_dir, mode="fp32"):
+    """Load the Whisper processor and model for the given inference mode."""
+    if mode not in WHISPER_MODES:
+        raise ValueError(f"Unknown Whisper mode {mode!r}, expected one of {WHISPER_MODES}")
+    # Load from local directory
+    processor = AutoProcessor.from_pretrained(model_dir, local_files_only=True)
+    if mode.startswith("int8"):
+        model = _load_quantized_model(model_dir)
+    else:
+        model = AutoModelForSpeechSeq2Seq.from_pretrained(model_dir, local_files_only=True)
+    model.eval()
+    if mode.endswith("-compiled"):
+        # Only the encoder sees fixed-size 30 s inputs; compiling the
+        # decoder would recompile for every generated length
+        model.model.encoder = torch.compile(model.model.encoder)
+    return processor, model
+
+
+class WhisperModelManager:
+    """Load Whisper on first use, keep it warm while busy, release it when idle.
+
+    States are "unloaded", "loading" and "warm". Callers borrow the model with
+    `with manager.acquire() as (processor, model):`; once nobody has held it
+    for idle_timeout seconds it is dropped so the memory is available again
+    while students are taking tests.
+    """
+
+    UNLOADED = "unloaded"
+    LOADING = "loading"
+    WARM = "warm"
+
+    def __init__(self, model_dir, idle_timeout=WHISPER_IDLE_TIMEOUT, mode=WHISPER_MODE,
+                 assistant_dir=None):
+        self.model_dir = model_dir
+        self.idle_timeout = idle_timeout
+        self.mode = mode
+        self.assistant_dir = assistant_dir
+        self.processor = None
+        self.model = None
+        self.assistant_model = None
+        self.log_mel = None
+        self.state = self.UNLOADED
+        self.load_count = 0
+        self._in_use = 0
+        self._last_used = None
+        self._timer = None
+        self._load_lock = threading.Lock()
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._load_lock:
+            if self.model is not None:
+                return
+            self.state = self.LOADING
+            print(f"[SnapClass] Loading Whisper model ({self.mode})...", flush=True)
+            try:
+                self.processor, self.model = load_whisper_model(self.model_dir, self.mode)
+                feature_extractor = self.processor.feature_extractor
+                self.log_mel = BatchLogMel(
+                    feature_extractor.mel_filters,
+                    n_fft=feature_extractor.n_fft,
+                    hop_length=feature_extractor.hop_length,
+                    n_samples=feature_extractor.n_samples
+                )
+                if self.assistant_dir:
+                    self.assistant_model = self._load_assistant()
+            except Exception:
+                self.processor = None
+                self.model = None
+                self.assistant_model = None
+                self.log_mel = None
+                self.state = self.UNLOADED
+                raise
+            self.load_count += 1
+            self.state = self.WARM
+
+    def _load_assistant(self):
+        if not os.path.isdir(self.assistant_dir):
+            print(f"[SnapClass] Assistant model not found in {self.assistant_dir}, "
+                  "using plain greedy decoding.", flush=True)
+            return None
+        assistant = AutoModelForSpeechSeq2Seq.from_pretrained(self.assistant_dir, local_files_only=True)
+        assistant.eval()
+        return assistant
+
+    @contextmanager
+    def acquire(self):
+        """Borrow the (processor, model) pair, loading it if necessary."""
+        with self._lock:
+            self._in_use += 1
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        try:
+            self._load()
+            yield self.processor, self.model
+        finally:
+            with self._lock:
+                self._in_use -= 1
+                self._last_used = time.monotonic()
+                if self._in_use == 0 and self.idle_timeout is not None:
+                    self._timer = threading.Timer(self.idle_timeout, self._evict_if_idle)
+                    self._timer.daemon = True
+                    self._timer.start()
+
+    def _evict_if_idle(self):
+        with self._lock:
+            if self._in_use or self._last_used is None:
+                return
+            if time.monotonic() - self._last_used < self.idle_timeout:
+                return
+            self._timer = None
+        self.unload()
+
+    def unload(self):
+        """Release the model unless a transcription is currently using it."""
+        with self._load_lock, self._lock:
+            if self._in_use or self.model is None:
+                return False
+            self.processor = None
+            self.model = None
+            self.assistant_model = None
+            self.log_mel = None
+            self.state = self.UNLOADED
+        gc.collect()
+        print("[SnapClass] Whisper model released after idle timeout.", flush=True)
+        return True
+
+    def status(self):
+        idle_for = None
+        if self._last_used is not None and not self._in_use:
+            idle_for = round(time.monotonic() - self._last_used, 1)
+        return {
+            "state": self.state,
+            "mode": self.mode,
+            "assistant": self.assistant_model is not None,
+            "in_use": self._in_use,
+            "idle_seconds": idle_for,
+            "idle_timeout": self.idle_timeout,
+            "load_count": self.load_count,
+        }
+
+
+whisper_manager = WhisperModelManager(
+    model_dir,
+    assistant_dir=assistant_model_dir if WHISPER_USE_ASSISTANT else None
+)
+
+# Finished transcripts keyed by audio hash + model + decoding parameters
+TRANSCRIPT_CACHE_MB = float(os.environ.get("SNAPCLASS_TRANSCRIPT_CACHE_MB", 64))
+transcript_cache = DiskCache(
+    os.path.join(get_base_dir(), "cache", "transcripts"),
+    max_bytes=int(TRANSCRIPT_CACHE_MB * 1024 * 1024),
+    name="transcript"
+)
 
 
 def chunk_audio(audio_array, chunk_duration_sec=30, sampling_rate=16000):
@@ -28,60 +244,491 @@ def chunk_audio(audio_array, chunk_duration_sec=30, sampling_rate=16000):
         for i in range(0, len(audio_array), chunk_size)
     ]
 
-def transcribe_chunk(chunk_array, sampling_rate=16000, max_new_tokens=444):
-    """Transcribe a single audio chunk using Whisper."""
-    # Pad or trim to 30 seconds
-    target_length = sampling_rate * 30
-    if len(chunk_array) > target_length:
-        chunk_array = chunk_array[:target_length]
-    else:
-        chunk_array = np.pad(chunk_array, (0, target_length - len(chunk_array)), 'constant')
-
-    # Prepare input
-    inputs = processor(
-        chunk_array,
-        sampling_rate=sampling_rate,
-        return_tensors="pt",
-        return_attention_mask=True
-    )
+def extract_features(chunk_arrays, sampling_rate=16000):
+    """Compute log-mel input features for a batch of chunks (padded to 30 seconds).
+
+    Features are written by log_mel.BatchLogMel straight into the tensor that
+    is passed to the model. Chunks are padded before feature extraction, so
+    the attention mask covers every frame, as it does with the HF processor.
+    """
+    with whisper_manager.acquire():
+        log_mel = whisper_manager.log_mel
+        features = torch.empty((len(chunk_arrays), log_mel.n_mels, log_mel.n_frames), dtype=torch.float32)
+        log_mel(chunk_arrays, out=features.numpy())
+    attention_mask = torch.ones((len(chunk_arrays), log_mel.n_frames), dtype=torch.long)
+    return BatchFeature({"input_features": features, "attention_mask": attention_mask})
+
+def generate_batch(inputs, max_new_tokens=444, language=None, task="transcribe"):
+    """Run Whisper generate on prepared features and decode the texts.
 
-    # Generate transcription
-    with torch.no_grad():
-        predicted_ids = model.generate(
-            inputs.input_features,
-            attention_mask=inputs.attention_mask,
+    language (e.g. "en") forces the decoder prompt so Whisper does not
+    re-detect the language for every chunk; None keeps per-chunk detection.
+
+    When an assistant model is loaded, chunks are decoded one at a time with
+    assisted generation instead (it only supports batch size 1); the output
+    is the same as plain greedy decoding.
+    """
+    with whisper_manager.acquire() as (processor, model):
+        generate_kwargs = dict(
             max_new_tokens=max_new_tokens,
             num_beams=1,
             temperature=0.0,
             early_stopping=False,
             return_dict_in_generate=False
         )
+        if language:
+            generate_kwargs.update(language=language, task=task)
+        assistant = whisper_manager.assistant_model
 
-    # Decode result
-    transcription = processor.batch_decode(
-        predicted_ids,
-        skip_special_tokens=True,
-        clean_up_tokenization_spaces=True
-    )[0]
+        # Generate transcription
+        with torch.no_grad():
+            if assistant is None:
+                predicted_ids = [model.generate(
+                    inputs.input_features,
+                    attention_mask=inputs.attention_mask,
+                    **generate_kwargs
+                )]
+            else:
+                predicted_ids = [
+                    model.generate(
+                        inputs.input_features[k:k + 1],
+                        attention_mask=inputs.attention_mask[k:k + 1],
+                        assistant_model=assistant,
+                        **generate_kwargs
+                    )
+                    for k in range(len(inputs.input_features))
+                ]
 
-    return transcription.strip()
+        # Decode result
+        transcriptions = []
+        for ids in predicted_ids:
+            transcriptions.extend(processor.batch_decode(
+                ids,
+                skip_special_tokens=True,
+                clean_up_tokenization_spaces=True
+            ))
 
-def transcribe_audio(audio_path, output_dir="output"):
-    """Transcribe an entire .wav file using chunking and save to markdown."""
-    audio_array, _ = librosa.load(audio_path, sr=16000, mono=True)
-    audio_chunks = chunk_audio(audio_array)
+    return [text.strip() for text in transcriptions]
 
-    full_transcription = ""
-    for i, chunk in enumerate(audio_chunks):
-        print(f"Transcribing chunk {i+1}/{len(audio_chunks)}...")
-        chunk_text = transcribe_chunk(chunk)
-        full_transcription += chunk_text + " "
+def transcribe_batch(chunk_arrays, sampling_rate=16000, max_new_tokens=444,
+                     language=None, task="transcribe"):
+    """Transcribe several audio chunks with a single Whisper generate call."""
+    inputs = extract_features(chunk_arrays, sampling_rate)
+    return generate_batch(inputs, max_new_tokens, language, task)
 
-    # Save to markdown
-    os.makedirs(output_dir, exist_ok=True)
+def transcribe_chunk(chunk_array, sampling_rate=16000, max_new_tokens=444,
+                     language=None, task="transcribe"):
+    """Transcribe a single audio chunk using Whisper."""
+    return transcribe_batch([chunk_array], sampling_rate, max_new_tokens, language, task)[0]
+
+def detect_language(chunk_array, sampling_rate=16000):
+    """Detect the spoken language of one chunk, returned as a code like "en"."""
+    with whisper_manager.acquire() as (processor, model):
+        inputs = extract_features([chunk_array], sampling_rate)
+        with torch.no_grad():
+            lang_ids = model.detect_language(inputs.input_features)
+        token = processor.tokenizer.decode(lang_ids[0])
+    return token.strip("<|>")
+
+def stream_audio(audio_path, sampling_rate=16000, block_sec=30):
+    """Yield the audio as mono float32 blocks of block_sec seconds at sampling_rate.
+
+    The file is decoded block by block with soundfile and resampled with a
+    streaming soxr resampler, so the full waveform is never held in memory.
+    Formats libsndfile cannot read fall back to a one-shot librosa.load.
+    """
+    block_size = int(sampling_rate * block_sec)
+    try:
+        audio_file = sf.SoundFile(audio_path)
+    except Exception:
+        audio_array, _ = librosa.load(audio_path, sr=sampling_rate, mono=True)
+        for i in range(0, len(audio_array), block_size):
+            yield audio_array[i:i + block_size]
+        return
+
+    with audio_file:
+        resampler = None
+        if audio_file.samplerate != sampling_rate:
+            resampler = soxr.ResampleStream(audio_file.samplerate, sampling_rate, 1, dtype="float32")
+        read_size = int(audio_file.samplerate * block_sec)
+        pending = np.zeros(0, dtype=np.float32)
+        while True:
+            data = audio_file.read(read_size, dtype="float32", always_2d=True)
+            last = len(data) < read_size
+            mono = np.ascontiguousarray(data.mean(axis=1), dtype=np.float32)
+            if resampler is not None:
+                mono = resampler.resample_chunk(mono, last=last)
+            pending = np.concatenate((pending, mono))
+            while len(pending) >= block_size:
+                yield pending[:block_size]
+                pending = pending[block_size:]
+            if last:
+                break
+        if len(pending):
+            yield pending
+
+def audio_duration(audio_path):
+    """Duration of the recording in seconds, read from the file header when possible."""
+    try:
+        return sf.info(audio_path).duration
+    except Exception:
+        return librosa.get_duration(path=audio_path)
+
+def iter_audio_windows(audio_path, sampling_rate=16000, chunk_duration_sec=30, use_vad=True):
+    """Yield (window, samples) pairs ready for transcribe_batch.
+
+    window is a list of absolute (start_sample, end_sample) spans; with use_vad
+    it holds the speech segments packed into that chunk (see vad.py),
+    otherwise a single fixed chunk_duration_sec span.
+    """
+    blocks = stream_audio(audio_path, sampling_rate, chunk_duration_sec)
+    if use_vad:
+        yield from stream_segment_windows(blocks, sampling_rate, chunk_duration_sec)
+        return
+    offset = 0
+    for block in blocks:
+        yield [(offset, offset + len(block))], block
+        offset += len(block)
+
+def pipeline_stage(items, fn=None, maxsize=2):
+    """Consume items (applying fn) in a background thread, yielding the results.
+
+    Results are handed over through a queue of at most maxsize entries, so the
+    producer only runs a little ahead of the consumer. Exceptions raised by
+    the producer are re-raised in the consumer.
+    """
+    results = queue.Queue(maxsize)
+    finished = object()
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for item in items:
+                if stop.is_set():
+                    return
+                results.put((fn(item) if fn else item, None))
+        except BaseException as e:
+            results.put((None, e))
+            return
+        results.put((finished, None))
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            value, error = results.get()
+            if error is not None:
+                raise error
+            if value is finished:
+                return
+            yield value
+    finally:
+        # Unblock the producer if the consumer stopped early
+        stop.set()
+        while thread.is_alive():
+            try:
+                results.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+def _init_transcription_worker(num_threads):
+    """Process-pool initializer: split the CPU cores between the workers."""
+    torch.set_num_threads(num_threads)
+
+def _transcribe_in_worker(chunk_arrays, language, task):
+    # Each worker process has its own whisper_manager and loads its own model
+    return transcribe_batch(chunk_arrays, language=language, task=task)
+
+def decode_batches(batches, workers=1, language=None, task="transcribe", pipelined=True):
+    """Transcribe (window, samples) batches, yielding (batch, texts, language) in order.
+
+    With pipelined (single process only), audio decoding/VAD, feature
+    extraction and generate run as three overlapping stages connected by
+    bounded queues: while the model decodes batch k, the features of batch
+    k+1 are computed and later audio is read, so the end-to-end time
+    approaches the time spent in generate alone.
+
+    language="auto" detects the language once on the first chunk and forces
+    it for the rest of the lecture; None leaves detection to every chunk.
+
+    With workers > 1 the batches are spread over a pool of processes, each
+    holding its own copy of the model and an equal share of the CPU threads.
+    At most two batches per worker are in flight, so streaming audio is never
+    read far ahead of the decoder.
+    """
+    batches = iter(batches)
+    first = None
+    if language == "auto":
+        first = next(batches, None)
+        if first is None:
+            return
+        batches = itertools.chain([first], batches)
+
+    if workers <= 1:
+        # Hold the model for the whole lecture so it is not evicted between chunks
+        with whisper_manager.acquire():
+            if first is not None:
+                language = detect_language(first[0][1])
+                print(f"[SnapClass] Detected lecture language: {language}", flush=True)
+            if not pipelined:
+                for batch in batches:
+                    texts = transcribe_batch([samples for _, samples in batch], language=language, task=task)
+                    yield batch, texts, language
+                return
+
+            started = time.perf_counter()
+            generate_time = 0.0
+            featurized = pipeline_stage(
+                pipeline_stage(batches),
+                lambda batch: (batch, extract_features([samples for _, samples in batch]))
+            )
+            for batch, inputs in featurized:
+                generate_started = time.perf_counter()
+                texts = generate_batch(inputs, language=language, task=task)
+                generate_time += time.perf_counter() - generate_started
+                yield batch, texts, language
+            print(f"[SnapClass] Transcription took {time.perf_counter() - started:.1f}s "
+                  f"({generate_time:.1f}s in generate)", flush=True)
+        return
+
+    threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_transcription_worker,
+        initargs=(threads_per_worker,)
+    ) as pool:
+        if first is not None:
+            language = pool.submit(detect_language, first[0][1]).result()
+            print(f"[SnapClass] Detected lecture language: {language}", flush=True)
+        pending = deque()
+        for batch in batches:
+            samples = [samples for _, samples in batch]
+            pending.append((batch, pool.submit(_transcribe_in_worker, samples, language, task)))
+            if len(pending) >= 2 * workers:
+                done, future = pending.popleft()
+                yield done, future.result(), language
+        while pending:
+            done, future = pending.popleft()
+            yield done, future.result(), language
+
+def transcription_path(audio_path, output_dir="output"):
+    """Path of the markdown transcript written for audio_path."""
     base_name = os.path.splitext(os.path.basename(audio_path))[0]
-    output_path = os.path.join(output_dir, f"{base_name}_transcription.md")
+    return os.path.join(output_dir, f"{base_name}_transcription.md")
+
+def transcript_cache_key(audio_hash, **params):
+    """Cache key for a transcript: audio bytes, model and decoding parameters."""
+    return make_key(audio_hash, model_id(), params)
+
+# Checkpoints are shared by every output directory, so uploading an
+# interrupted recording again (even into a new lesson) resumes it
+CHECKPOINT_DIR = os.path.join(get_base_dir(), "cache", "checkpoints")
+_active_checkpoints = set()
+_checkpoint_lock = threading.Lock()
+
+def checkpoint_path(key):
+    """Checkpoint file of a transcript cache key: one JSON line per finished chunk."""
+    return os.path.join(CHECKPOINT_DIR, f"{key}.jsonl")
+
+def claim_checkpoint(key):
+    """Return (path, claimed) for a run that is about to write a checkpoint.
+
+    Only one run per key may use the shared checkpoint; a second run of the
+    same recording at the same time gets a private file that is not resumed.
+    """
+    with _checkpoint_lock:
+        if key not in _active_checkpoints:
+            _active_checkpoints.add(key)
+            return checkpoint_path(key), True
+    return os.path.join(CHECKPOINT_DIR, f"{key}.{uuid.uuid4().hex}.jsonl"), False
+
+def release_checkpoint(key, claimed):
+    if claimed:
+        with _checkpoint_lock:
+            _active_checkpoints.discard(key)
+
+def load_checkpoint(path, audio_hash):
+    """Return the chunk records of an interrupted run, in order.
+
+    Reading stops at the first line that is incomplete (the process died
+    while writing it), belongs to another recording or is out of order.
+    """
+    records = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if record.get("audio_hash") != audio_hash or record.get("index") != len(records) + 1:
+                    break
+                records.append(record)
+    except OSError:
+        return []
+    return records
+
+def _write_cached_transcript(cached, output_path, duration):
+    """Write a cached transcript to output_path and yield its chunk events."""
     with open(output_path, "w", encoding="utf-8") as f:
-        f.write(full_transcription.strip())
+        f.write(cached["text"])
+    save_segments(segments_path(output_path), cached["chunks"])
+    for chunk in cached["chunks"]:
+        yield {
+            "language": cached.get("language"),
+            **chunk,
+            "total": len(cached["chunks"]),
+            "duration_sec": duration,
+            "output_path": output_path,
+            "cached": True,
+        }
+
+def iter_transcription(audio_path, output_dir="output", batch_size=4, use_vad=True, use_cache=True,
+                       workers=1, language="auto", task="transcribe", pipelined=True, resume=True):
+    """Transcribe audio_path chunk by chunk, yielding each chunk as it is decoded.
+
+    The markdown transcript is appended to after every chunk, so it can be read
+    while the rest of the lecture is still being transcribed. Each yielded dict
+    has the keys index (1-based), total, text, start_sec, end_sec,
+    duration_sec and output_path. Audio is streamed from disk, so total is
+    only known up front for fixed windows and is None with use_vad.
+
+    With use_cache, a recording that was already transcribed with the same
+    model and settings is served from transcript_cache instead. workers > 1
+    decodes batches in that many processes; otherwise pipelined overlaps
+    audio decoding, feature extraction and generate (see decode_batches).
+
+    language is a Whisper language code, "auto" to detect it once on the
+    first chunk, or None to let Whisper detect it per chunk. The language
+    used is reported in every chunk event.
+
+    When the recording is done, the chunks' time ranges and texts are also
+    saved as a segment index next to the markdown (see transcript_index.py).
+
+    Every finished chunk is also appended to a checkpoint under
+    cache/checkpoints, keyed like the transcript cache. With resume, a run
+    that was interrupted (server stopped, crash) replays the checkpointed
+    chunks and continues with the first chunk that was not finished; the
+    checkpoint is removed once the whole recording is done.
+    """
+    sampling_rate = 16000
+    duration = audio_duration(audio_path)
+    batch_size = max(1, int(batch_size))
+    total = None if use_vad else int(np.ceil(duration / 30))
+
+    os.makedirs(output_dir, exist_ok=True)
+    output_path = transcription_path(audio_path, output_dir)
+
+    audio_hash = file_sha256(audio_path)
+    cache_key = transcript_cache_key(
+        audio_hash, use_vad=use_vad, chunk_sec=30, max_new_tokens=444, num_beams=1,
+        mode=whisper_manager.mode, language=language, task=task
+    )
+    if use_cache:
+        cached = transcript_cache.get(cache_key)
+        if cached is not None:
+            yield from _write_cached_transcript(cached, output_path, duration)
+            return
+
+    os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+    checkpoint, claimed = claim_checkpoint(cache_key)
+    try:
+        chunks = load_checkpoint(checkpoint, audio_hash) if resume and claimed else []
+        chunk_language = None
+        if chunks:
+            print(f"[SnapClass] Resuming transcription after chunk {len(chunks)}", flush=True)
+            chunk_language = chunks[-1].get("language")
+            if language == "auto" and chunk_language:
+                language = chunk_language
+
+        # Rewrite the checkpoint and the markdown from the chunks kept, so a
+        # truncated last line does not linger
+        written = False
+        with open(checkpoint, "w", encoding="utf-8") as cp, open(output_path, "w", encoding="utf-8") as f:
+            for chunk in chunks:
+                cp.write(json.dumps(chunk) + "\n")
+                if chunk["text"]:
+                    f.write((" " if written else "") + chunk["text"])
+                    written = True
+        for chunk in chunks:
+            yield {
+                **chunk,
+                "total": total,
+                "duration_sec": duration,
+                "output_path": output_path,
+                "resumed": True,
+            }
+        resume_from = len(chunks)
+
+        def batches():
+            batch = []
+            windows = iter_audio_windows(audio_path, sampling_rate, use_vad=use_vad)
+            for window, samples in itertools.islice(windows, resume_from, None):
+                batch.append((window, samples))
+                if len(batch) == batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+        index = resume_from
+        for batch, texts, chunk_language in decode_batches(batches(), workers, language, task, pipelined):
+            with open(output_path, "a", encoding="utf-8") as f:
+                for chunk_text in texts:
+                    if chunk_text:
+                        f.write((" " if written else "") + chunk_text)
+                        written = True
+            with open(checkpoint, "a", encoding="utf-8") as cp:
+                new_chunks = []
+                for (window, _), chunk_text in zip(batch, texts):
+                    index += 1
+                    chunk = {
+                        "index": index,
+                        "text": chunk_text,
+                        "start_sec": window[0][0] / sampling_rate,
+                        "end_sec": window[-1][1] / sampling_rate,
+                        "language": chunk_language,
+                        "audio_hash": audio_hash,
+                    }
+                    cp.write(json.dumps(chunk) + "\n")
+                    new_chunks.append(chunk)
+                cp.flush()
+                os.fsync(cp.fileno())
+            for chunk in new_chunks:
+                chunks.append(chunk)
+                yield {
+                    **chunk,
+                    "total": total,
+                    "duration_sec": duration,
+                    "output_path": output_path,
+                }
+
+        save_segments(segments_path(output_path), chunks)
+        if use_cache:
+            text = " ".join(chunk["text"] for chunk in chunks if chunk["text"])
+            transcript_cache.put(cache_key, {"text": text, "chunks": chunks, "language": chunk_language})
+        os.remove(checkpoint)
+    finally:
+        release_checkpoint(cache_key, claimed)
+        if not claimed and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+
+def transcribe_audio(audio_path, output_dir="output", batch_size=4, use_vad=True, use_cache=True,
+                     workers=1, language="auto", task="transcribe", pipelined=True):
+    """Transcribe an entire .wav file using chunking and save to markdown.
+
+    Chunks are decoded batch_size at a time; batch_size=1 decodes them one by one.
+    With use_vad, silent stretches are dropped and chunks are cut on pauses
+    instead of blind 30 second windows.
+    """
+    texts = []
+    for chunk in iter_transcription(
+        audio_path, output_dir,
+        batch_size=batch_size, use_vad=use_vad, use_cache=use_cache,
+        workers=workers, language=language, task=task, pipelined=pipelined
+    ):
+        if chunk["text"]:
+            texts.append(chunk["text"])
 
-    return {"text": full_transcription.strip(), "output_path": output_path}
+    return {"text": " ".join(texts), "output_path": transcription_path(audio_path, output_dir)}
@@ -0,0 +1,49 @@
+from boilerplate import normalise_line, strip_boilerplate
+
+
+def make_document(pages):
+    """Extractor markdown with one "## Page N" section per list of lines."""
+    return "".join(
+        f"## Page {number}\n" + "".join(f"{line}\n" for line in lines)
+        for number, lines in enumerate(pages, start=1)
+    )
+
+
+def test_numbered_question_headings_are_kept():
+    pages = [
+        [f"Question {n}", "Answer the following in full sentences.", "Show your working.", f"Marks: {n + 2}"]
+        for n in range(1, 11)
+    ]
+    cleaned, stats = strip_boilerplate(make_document(pages))
+    for n in range(1, 11):
+        assert f"Question {n}\n" in cleaned
+    assert stats["lines_removed"] == 0
+
+
+def test_numbered_body_lines_at_page_edges_are_kept():
+    pages = [[f"body line a {n}", "middle", "more middle", f"body line z {n}"] for n in range(1, 11)]
+    cleaned, stats = strip_boilerplate(make_document(pages))
+    assert cleaned == make_document(pages)
+    assert stats["lines_removed"] == 0
+
+
+def test_running_header_and_footer_with_page_numbers_are_removed():
+    # Printed page numbers run 12 ahead of the PDF pages (front matter)
+    pages = [
+        [f"Physics - {n + 12}", f"Exercise 3.{n}", "Body text of the page.", f"Page {n} of 10"]
+        for n in range(1, 11)
+    ]
+    cleaned, stats = strip_boilerplate(make_document(pages))
+    assert "Physics" not in cleaned
+    assert "of 10" not in cleaned
+    for n in range(1, 11):
+        assert f"Exercise 3.{n}\n" in cleaned
+    assert stats["lines_removed"] == 20
+
+
+def test_normalise_line_masks_only_numbers_that_track_the_page():
+    assert normalise_line("Physics - 14", 14) == normalise_line("Physics - 15", 15)
+    assert normalise_line("14 | Motion", 14) == normalise_line("15 | Motion", 15)
+    assert normalise_line("Page 3 of 10") == normalise_line("Page 4 of 10")
+    assert normalise_line("Question 1", 1) != normalise_line("Question 2", 2)
+    assert normalise_line("Physics - 14", 14) != normalise_line("Physics - 14", 15)
@@ -1,9 +1,13 @@
 import threading
 import os
 import sys
+import time
+from concurrent import futures
 from datetime import datetime
-from stt import transcribe_audio
+from stt import iter_transcription, transcription_path
 from pdf_reader2 import PDFTextImageExtractorPypdf as PDFTextImageExtractor
+from progress import ProgressReporter
+from boilerplate import clean_content_file
 
 def get_base_dir():
     """Get the correct base directory for MSIX or dev environment."""
@@ -12,7 +16,8 @@ def get_base_dir():
     return os.path.dirname(os.path.abspath(__file__))
 
 class ContentProcessor:
-    def __init__(self, output_dir=None):
+    def __init__(self, output_dir=None, batch_size=4, transcription_workers=None, language="auto",
+                 pdf_workers=None, progress_rate=None, pdf_extractor=None, stop_event=None):
         if output_dir is None:
             # Use the correct base directory
             base_dir = get_base_dir()
@@ -20,39 +25,98 @@ class ContentProcessor:
         else:
             self.output_dir = output_dir
         os.makedirs(self.output_dir, exist_ok=True)
+        self.batch_size = batch_size  # Whisper chunks decoded per generate call
+        if transcription_workers is None:
+            # Each worker holds its own Whisper copy, so this is opt-in
+            transcription_workers = int(os.environ.get("SNAPCLASS_WHISPER_WORKERS", 1))
+        self.transcription_workers = transcription_workers
+        self.language = language  # Whisper language code, "auto" or None
+        if pdf_workers is None:
+            pdf_workers = int(os.environ.get("SNAPCLASS_PDF_WORKERS", min(4, os.cpu_count() or 1)))
+        self.pdf_workers = pdf_workers
+        if progress_rate is None:
+            # Status updates per second and stage; 0 disables throttling
+            progress_rate = float(os.environ.get("SNAPCLASS_PROGRESS_RATE", 2))
+        self.progress_rate = progress_rate
+        # A long-lived service passes its extractor in instead of one per file
+        self.pdf_extractor = pdf_extractor
+        self.stop_event = stop_event  # set on shutdown; transcription stops at the next chunk
         self.status_callback = None
         
     def set_status_callback(self, callback):
-        """Set callback function for status updates"""
+        """Set callback function for status updates
+
+        Status updates are coalesced by a ProgressReporter so that long files
+        do not produce one update per page or chunk.
+        """
+        if callback is not None and self.progress_rate:
+            callback = ProgressReporter(callback, max_per_sec=self.progress_rate)
         self.status_callback = callback
+
+    def _flush_status(self, stage):
+        """Send the last throttled update of a stage before it reports completion."""
+        if isinstance(self.status_callback, ProgressReporter):
+            self.status_callback.flush(stage)
         
-    def _update_status(self, message, is_content=False):
-        """Helper function to send status updates"""
+    def _update_status(self, message, is_content=False, **details):
+        """Helper function to send status updates
+
+        Extra keyword arguments (stage, current, total, ...) are added to the
+        update dict. Updates that are already dicts, such as the ones emitted
+        by the PDF extractor, are forwarded with only those keys added.
+        """
         if self.status_callback:
-            self.status_callback({
+            if isinstance(message, dict):
+                self.status_callback({**message, **details})
+                return
+            update = {
                 'type': 'content' if is_content else 'status',
                 'message': message if not is_content else message,
                 'content': message if is_content else None
-            })
+            }
+            update.update(details)
+            self.status_callback(update)
     
     def process_audio(self, audio_path):
         """Process audio file and convert to text"""
         try:
             self._update_status("Starting audio transcription...")
 
-            # Transcribe audio
-            result = transcribe_audio(
+            # Transcribe audio; stt.py appends each chunk to the markdown file
+            output_path = transcription_path(audio_path, self.output_dir)
+            for chunk in iter_transcription(
                 audio_path=audio_path,
-                output_dir=self.output_dir
-            )
-
-            # Save to markdown (already done in stt.py)
-            output_path = result["output_path"]
+                output_dir=self.output_dir,
+                batch_size=self.batch_size,
+                workers=self.transcription_workers,
+                language=self.language
+            ):
+                if self.stop_event is not None and self.stop_event.is_set():
+                    # The chunk checkpoint lets the next run resume from here
+                    raise RuntimeError("Transcription stopped: server is shutting down")
+                # Progress is measured in seconds of audio, which is known even
+                # when the number of speech chunks is not
+                self._update_status(
+                    f"Transcribed audio chunk {chunk['index']} "
+                    f"({chunk['end_sec']:.0f}s/{chunk['duration_sec']:.0f}s)",
+                    stage='audio',
+                    current=round(chunk['end_sec'], 1),
+                    total=round(chunk['duration_sec'], 1)
+                )
+                if chunk['text']:
+                    self._update_status(
+                        chunk['text'],
+                        is_content=True,
+                        stage='audio',
+                        chunk=chunk['index']
+                    )
 
+            self._flush_status('audio')
             self._update_status(f"Audio transcription completed and saved to: {output_path}")
             return output_path
 
         except Exception as e:
+            self._flush_status('audio')
             self._update_status(f"Error in audio processing: {str(e)}")
             raise
     
@@ -62,73 +126,196 @@ class ContentProcessor:
             self._update_status("Starting PDF processing...")
             
             # Initialize PDF extractor
-            extractor = PDFTextImageExtractor()
+            extractor = self.pdf_extractor or PDFTextImageExtractor(workers=self.pdf_workers)
             
-            # Process PDF with status updates
-            pdf_content = extractor.extract_full_content(
-                pdf_path,
-                output_dir=self.output_dir,
-                status_callback=self._update_status
-            )
-            
-            # Save to markdown
+            # Extract and write the markdown page by page
             base_name = os.path.splitext(os.path.basename(pdf_path))[0]
             output_path = os.path.join(self.output_dir, f"{base_name}_content.md")
-            
-            extractor.save_to_markdown(pdf_content, output_path)
+            try:
+                extractor.stream_to_markdown(
+                    pdf_path,
+                    output_path,
+                    status_callback=lambda update: self._update_status(update, stage='pdf')
+                )
+            finally:
+                if extractor is not self.pdf_extractor:
+                    extractor.close()
+            self._flush_status('pdf')
+
+            # Running headers, footers and page numbers only lengthen the LLM prompts
+            stats = clean_content_file(output_path)
+            self._update_status(
+                f"Removed {stats['lines_removed']} repeated header/footer lines "
+                f"({stats['chars_saved']} chars, ~{stats['tokens_saved']} tokens)",
+                boilerplate=stats
+            )
             self._update_status(f"PDF processing completed and saved to: {output_path}")
             return output_path
             
         except Exception as e:
+            self._flush_status('pdf')
             self._update_status(f"Error in PDF processing: {str(e)}")
             raise
 
-def process_files(audio_path, pdf_path, status_callback=None):
+class LessonRun:
+    """Futures of one audio/PDF pair submitted to a ProcessingService."""
+
+    def __init__(self, audio_future, pdf_future):
+        self.audio_future = audio_future
+        self.pdf_future = pdf_future
+        self._finished = []  # futures in the order they completed
+        self._lock = threading.Lock()
+        for future in (audio_future, pdf_future):
+            future.add_done_callback(self._record_finished)
+
+    def _record_finished(self, future):
+        with self._lock:
+            self._finished.append(future)
+
+    def result(self, timeout=None):
+        """Wait for both stages and return (audio_output, pdf_output).
+
+        Waits for both stages even when one fails, then re-raises the error
+        of the stage that failed first, so no stage is still writing when the
+        caller sees the error.
+        """
+        futures.wait([self.audio_future, self.pdf_future], timeout=timeout)
+        with self._lock:
+            finished = list(self._finished)
+        for future in finished:
+            if not future.cancelled() and future.exception() is not None:
+                raise future.exception()
+        audio = self.audio_future.result(timeout=0)
+        pdf = self.pdf_future.result(timeout=0)
+        return audio['output_path'], pdf['output_path']
+
+    @property
+    def durations(self):
+        """Seconds spent in each finished stage."""
+        return {
+            stage: future.result()['duration_sec']
+            for stage, future in (('audio', self.audio_future), ('pdf', self.pdf_future))
+            if future.done() and not future.cancelled() and future.exception() is None
+        }
+
+
+class ProcessingService:
+    """Long-lived executor that runs the audio and PDF stages of lessons.
+
+    The thread pool and the PDF extractor (with its worker processes) are
+    created once and reused by every request. Each stage runs as a future
+    that returns its output path and duration, and re-raises whatever the
+    stage raised.
     """
-    Process audio and PDF files in parallel using threads
+
+    def __init__(self, max_workers=None):
+        if max_workers is None:
+            # Two stages per lesson, for as many lessons as the server runs at once
+            max_workers = 2 * int(os.environ.get("SNAPCLASS_LESSON_WORKERS", 2))
+        self.executor = futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="snapclass-stage")
+        self.pdf_extractor = PDFTextImageExtractor(
+            workers=int(os.environ.get("SNAPCLASS_PDF_WORKERS", min(4, os.cpu_count() or 1)))
+        )
+        self.stop_event = threading.Event()
+        self._running = set()
+        self._lock = threading.Lock()
+
+    def _run_stage(self, fn, path):
+        start = time.perf_counter()
+        output_path = fn(path)
+        return {'output_path': output_path, 'duration_sec': time.perf_counter() - start}
+
+    def _submit(self, fn, path):
+        with self._lock:
+            if self.stop_event.is_set():
+                raise RuntimeError("Processing service is shut down")
+            future = self.executor.submit(self._run_stage, fn, path)
+            self._running.add(future)
+        future.add_done_callback(self._forget)
+        return future
+
+    def _forget(self, future):
+        with self._lock:
+            self._running.discard(future)
+
+    def submit(self, audio_path, pdf_path, status_callback=None, language="auto", output_dir=None):
+        """Start transcription and PDF extraction of one lesson; returns a LessonRun."""
+        processor = ContentProcessor(
+            output_dir=output_dir,
+            language=language,
+            pdf_extractor=self.pdf_extractor,
+            stop_event=self.stop_event
+        )
+        if status_callback:
+            processor.set_status_callback(status_callback)
+        return LessonRun(
+            self._submit(processor.process_audio, audio_path),
+            self._submit(processor.process_pdf, pdf_path)
+        )
+
+    def shutdown(self, timeout=3.0):
+        """Refuse new work, drop queued stages and give running ones timeout seconds.
+
+        Transcription stops at its next chunk (its checkpoint is kept for
+        resuming); returns the number of stages still running afterwards.
+        """
+        with self._lock:
+            self.stop_event.set()
+            running = list(self._running)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        _, not_done = futures.wait(running, timeout=timeout)
+        self.pdf_extractor.close()
+        return len(not_done)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_service():
+    """The process-wide ProcessingService, created on first use."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = ProcessingService()
+        return _service
+
+
+def shutdown_service(timeout=3.0):
+    """Shut the shared service down if it was started; see ProcessingService.shutdown."""
+    with _service_lock:
+        service = _service
+    if service is None:
+        return 0
+    return service.shutdown(timeout)
+
+
+def process_files(audio_path, pdf_path, status_callback=None, language="auto", output_dir=None):
+    """
+    Process audio and PDF files in parallel on the shared ProcessingService
     
     Args:
         audio_path (str): Path to audio file
         pdf_path (str): Path to PDF file
         status_callback (callable): Function to receive status updates
+        language (str): Lecture language code (e.g. "en"), or "auto" to
+            detect it once from the first speech chunk
+        output_dir (str): Where to write the markdown files, output/ by default
         
     Returns:
         tuple: Paths to the generated markdown files (audio_transcription.md, pdf_content.md)
+
+    Raises:
+        Exception: whatever the audio or PDF stage raised
     """
-    processor = ContentProcessor()
-    if status_callback:
-        processor.set_status_callback(status_callback)
-    
-    # Create threads for parallel processing
-    audio_thread = threading.Thread(
-        target=processor.process_audio,
-        args=(audio_path,)
-    )
-    
-    pdf_thread = threading.Thread(
-        target=processor.process_pdf,
-        args=(pdf_path,)
+    run = get_service().submit(
+        audio_path,
+        pdf_path,
+        status_callback=status_callback,
+        language=language,
+        output_dir=output_dir
     )
-    
-    # Start both threads
-    audio_thread.start()
-    pdf_thread.start()
-    
-    # Wait for both threads to complete
-    audio_thread.join()
-    pdf_thread.join()
-    
-    # Return paths to generated files
-    audio_output = os.path.join(
-        processor.output_dir,
-        f"{os.path.splitext(os.path.basename(audio_path))[0]}_transcription.md"
-    )
-    pdf_output = os.path.join(
-        processor.output_dir,
-        f"{os.path.splitext(os.path.basename(pdf_path))[0]}_content.md"
-    )
-    
-    return audio_output, pdf_output
+    return run.result()
 
 '''if __name__ == "__main__":
     # Example usage
@@ -0,0 +1,57 @@
+import os
+
+import numpy as np
+
+
+def segments_path(transcript_path):
+    """Path of the segment index stored next to a *_transcription.md file."""
+    base, _ = os.path.splitext(transcript_path)
+    if base.endswith("_transcription"):
+        base = base[:-len("_transcription")]
+    return f"{base}_segments.npz"
+
+
+def save_segments(path, chunks):
+    """Store chunk events (index, start_sec, end_sec, text) as columns in an .npz file.
+
+    Text is saved as a fixed-width unicode array, so the file loads without
+    pickle.
+    """
+    columns = {
+        "chunk_id": np.array([chunk["index"] for chunk in chunks], dtype=np.int32),
+        "start": np.array([chunk["start_sec"] for chunk in chunks], dtype=np.float32),
+        "end": np.array([chunk["end_sec"] for chunk in chunks], dtype=np.float32),
+        "text": np.array([chunk["text"] for chunk in chunks], dtype=str),
+    }
+    # np.savez appends .npz to names that lack it, so keep the suffix on the temp file
+    tmp_path = f"{path[:-len('.npz')]}.tmp.npz"
+    np.savez_compressed(tmp_path, **columns)
+    os.replace(tmp_path, path)
+
+
+def load_segments(path):
+    """Load the segment columns: chunk_id, start, end (seconds) and text."""
+    with np.load(path, allow_pickle=False) as data:
+        return {name: data[name] for name in ("chunk_id", "start", "end", "text")}
+
+
+def segments_in_range(segments, start_sec, end_sec):
+    """Return the segments that overlap [start_sec, end_sec] as a list of dicts."""
+    mask = (segments["end"] > start_sec) & (segments["start"] < end_sec)
+    return [
+        {
+            "chunk_id": int(segments["chunk_id"][i]),
+            "start_sec": float(segments["start"][i]),
+            "end_sec": float(segments["end"][i]),
+            "text": str(segments["text"][i]),
+        }
+        for i in np.flatnonzero(mask)
+    ]
+
+
+def text_for_range(path, start_sec, end_sec):
+    """Transcript text spoken between start_sec and end_sec."""
+    segments = load_segments(path)
+    return " ".join(
+        segment["text"] for segment in segments_in_range(segments, start_sec, end_sec) if segment["text"]
+    )
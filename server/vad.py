@@ -0,0 +1,186 @@
+import numpy as np
+
+
+def frame_energy_db(audio_array, frame_length):
+    """Return the RMS energy (in dBFS) of consecutive, non-overlapping frames."""
+    num_frames = len(audio_array) // frame_length
+    if num_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio_array[:num_frames * frame_length].reshape(num_frames, frame_length)
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+    return (20.0 * np.log10(rms + 1e-10)).astype(np.float32)
+
+
+def _runs(mask):
+    """Return (start, end) frame index pairs for each run of True in mask."""
+    padded = np.concatenate(([False], mask, [False]))
+    edges = np.flatnonzero(np.diff(padded.astype(np.int8)))
+    return list(zip(edges[0::2], edges[1::2]))
+
+
+def noise_floor_db(audio_array, sampling_rate=16000, frame_ms=30):
+    """Estimate the background level as the 10th percentile of frame energy."""
+    frame_length = max(1, int(sampling_rate * frame_ms / 1000))
+    energy = frame_energy_db(audio_array, frame_length)
+    if len(energy) == 0:
+        return None
+    return float(np.percentile(energy, 10))
+
+
+def speech_segments(audio_array, sampling_rate=16000, frame_ms=30,
+                    margin_db=12.0, dynamic_range_db=30.0, min_threshold_db=-55.0,
+                    min_speech_ms=250, min_silence_ms=400, pad_ms=200,
+                    noise_floor=None):
+    """Detect speech regions with an adaptive energy threshold.
+
+    The noise floor is estimated from the quietest frames (or passed in as
+    noise_floor) and anything margin_db above it counts as speech. The
+    threshold never rises above dynamic_range_db below the loudest frames, so
+    stretches of continuous speech are not mistaken for background, and never
+    drops below min_threshold_db. Pauses shorter than min_silence_ms
+    are bridged so that words are not split, blips shorter than min_speech_ms
+    are dropped and every segment is padded by pad_ms on both sides.
+
+    Returns a list of (start_sample, end_sample) tuples.
+    """
+    frame_length = max(1, int(sampling_rate * frame_ms / 1000))
+    energy = frame_energy_db(audio_array, frame_length)
+    if len(energy) == 0:
+        return []
+
+    if noise_floor is None:
+        noise_floor = np.percentile(energy, 10)
+    peak = np.percentile(energy, 95)
+    threshold = max(min(noise_floor + margin_db, peak - dynamic_range_db), min_threshold_db)
+    mask = energy > threshold
+
+    # Bridge short pauses inside speech
+    min_silence_frames = int(np.ceil(min_silence_ms / frame_ms))
+    for start, end in _runs(~mask):
+        if start > 0 and end < len(mask) and end - start < min_silence_frames:
+            mask[start:end] = True
+
+    # Drop isolated blips (door slams, coughs)
+    min_speech_frames = int(np.ceil(min_speech_ms / frame_ms))
+    pad = int(sampling_rate * pad_ms / 1000)
+    segments = []
+    for start, end in _runs(mask):
+        if end - start < min_speech_frames:
+            continue
+        seg_start = max(0, int(start) * frame_length - pad)
+        seg_end = min(len(audio_array), int(end) * frame_length + pad)
+        if segments and seg_start <= segments[-1][1]:
+            segments[-1] = (segments[-1][0], seg_end)
+        else:
+            segments.append((seg_start, seg_end))
+    return segments
+
+
+def split_long_segment(audio_array, start, end, max_samples, sampling_rate=16000,
+                       frame_ms=30, search_sec=5):
+    """Split a segment longer than max_samples at its quietest frames.
+
+    Each cut is placed at the lowest-energy frame in the last search_sec of
+    the allowed span, which in speech is almost always a pause between words.
+    """
+    frame_length = max(1, int(sampling_rate * frame_ms / 1000))
+    search = int(sampling_rate * search_sec)
+    pieces = []
+    while end - start > max_samples:
+        lo = start + max(max_samples - search, frame_length)
+        hi = start + max_samples
+        energy = frame_energy_db(audio_array[lo:hi], frame_length)
+        if len(energy):
+            cut = lo + int(np.argmin(energy)) * frame_length + frame_length // 2
+        else:
+            cut = hi
+        pieces.append((start, cut))
+        start = cut
+    pieces.append((start, end))
+    return pieces
+
+
+def pack_segments(segments, max_samples):
+    """Greedily pack consecutive segments into windows of at most max_samples.
+
+    Returns a list of windows, each a list of (start_sample, end_sample) tuples
+    whose combined length fits in one Whisper window.
+    """
+    windows = []
+    current, current_len = [], 0
+    for start, end in segments:
+        length = end - start
+        if current and current_len + length > max_samples:
+            windows.append(current)
+            current, current_len = [], 0
+        current.append((start, end))
+        current_len += length
+    if current:
+        windows.append(current)
+    return windows
+
+
+def segment_audio(audio_array, sampling_rate=16000, window_sec=30, **vad_kwargs):
+    """Drop silence and pack the remaining speech into Whisper-sized windows."""
+    max_samples = sampling_rate * window_sec
+    segments = []
+    for start, end in speech_segments(audio_array, sampling_rate, **vad_kwargs):
+        segments.extend(split_long_segment(audio_array, start, end, max_samples, sampling_rate))
+    return pack_segments(segments, max_samples)
+
+
+def window_samples(audio_array, window):
+    """Concatenate the speech segments of one packed window."""
+    return np.concatenate([audio_array[start:end] for start, end in window])
+
+
+def stream_segment_windows(blocks, sampling_rate=16000, window_sec=30,
+                           lookahead_windows=2, **vad_kwargs):
+    """Run segment_audio() over a stream of audio blocks.
+
+    Blocks are buffered until lookahead_windows windows beyond the current one
+    are available, and the noise floor is tracked across the whole stream.
+    Windows that end before that look-ahead region cannot be changed by audio
+    still to come and are emitted; the rest is carried over. Memory is
+    therefore bounded by a few windows, not the recording length.
+
+    Yields (window, samples) where window holds absolute (start, end) sample
+    indices and samples is the concatenated speech for that window.
+    """
+    max_samples = sampling_rate * window_sec
+    buffer = np.zeros(0, dtype=np.float32)
+    offset = 0  # absolute sample index of buffer[0]
+    floor = None  # quietest background level seen so far
+
+    def flush(final):
+        nonlocal floor
+        buffer_floor = noise_floor_db(buffer, sampling_rate)
+        if buffer_floor is not None and (floor is None or buffer_floor < floor):
+            floor = buffer_floor
+        windows = segment_audio(buffer, sampling_rate, window_sec, noise_floor=floor, **vad_kwargs)
+        keep_from = len(buffer) if final else len(buffer) - lookahead_windows * max_samples
+        emitted = [window for window in windows if window[-1][1] <= keep_from]
+        if emitted:
+            cut = emitted[-1][-1][1]
+        elif windows:
+            cut = min(windows[0][0][0], keep_from)
+        else:
+            cut = keep_from
+        out = [
+            ([(start + offset, end + offset) for start, end in window], window_samples(buffer, window))
+            for window in emitted
+        ]
+        return out, max(cut, 0)
+
+    for block in blocks:
+        buffer = np.concatenate((buffer, block))
+        if len(buffer) < (lookahead_windows + 1) * max_samples:
+            continue
+        out, cut = flush(final=False)
+        yield from out
+        buffer = buffer[cut:]
+        offset += cut
+
+    if len(buffer):
+        out, _ = flush(final=True)
+        yield from out